@@ -0,0 +1,180 @@
+'''times and memory profiles each conversion phase on a collection of
+matpower cases, reports the throughput per bus and per branch and the
+scaling of each phase with the case size, and stores the results as json
+for comparison across commits
+
+usage: python benchmarks/bench_cases.py [paths ...] [--repeat n]
+    [--skip-validation] [--output results.json] [--compare previous.json]
+
+paths are matpower files, directories or glob patterns, by default the
+cases in tests/data/correct and tests/data/idempotent
+'''
+
+from __future__ import print_function
+
+import argparse, io, json, math, os, platform, subprocess, sys, warnings
+
+import grg_mp2grg
+from grg_mp2grg.timings import Timings
+
+data_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'tests', 'data')
+default_paths = [os.path.join(data_dir, 'correct'), os.path.join(data_dir, 'idempotent')]
+
+phases = ['parse', 'to_grg', 'to_grg (validated)', 'serialization', 'build_mp_case', 'to_matpower']
+
+
+def run_phases(file_name, timings, validate=True):
+    '''runs each conversion phase of a matpower file once, recording it in
+    timings, grg validation is only run when validate is set
+
+    Returns: the parsed case
+    '''
+    with timings.phase('parse'):
+        case = grg_mp2grg.io.parse_mp_case_file(file_name)
+    with timings.phase('to_grg'):
+        grg_data = case.to_grg(skip_validation=True)
+    if validate:
+        with timings.phase('to_grg (validated)'):
+            case.to_grg()
+    with timings.phase('serialization'):
+        grg_mp2grg.io.write_grg_json(grg_data, io.StringIO())
+    with timings.phase('build_mp_case'):
+        mp_case = grg_mp2grg.io.build_mp_case(grg_data)
+    with timings.phase('to_matpower'):
+        mp_case.to_matpower()
+    return case
+
+
+def bench_case(file_name, repeat, validate=True):
+    '''Returns: the results of a case, the best wall and cpu time of each
+    phase over repeat runs after an untimed one, and its peak allocations in
+    a separate run'''
+    run_phases(file_name, Timings(trace_memory=False), validate)
+
+    best = {}
+    for _ in range(repeat):
+        timings = Timings(trace_memory=False)
+        case = run_phases(file_name, timings, validate)
+        for phase in timings.report():
+            if phase['phase'] not in best or phase['wall'] < best[phase['phase']]['wall']:
+                best[phase['phase']] = {'wall': phase['wall'], 'cpu': phase['cpu']}
+
+    timings = Timings(trace_memory=True)
+    run_phases(file_name, timings, validate)
+    for phase in timings.report():
+        best[phase['phase']]['peak'] = phase['peak']
+
+    buses, branches = len(case.bus), len(case.branch)
+    for result in best.values():
+        result['buses_per_second'] = buses/result['wall'] if result['wall'] > 0 else None
+        result['branches_per_second'] = branches/result['wall'] if result['wall'] > 0 else None
+
+    return {
+        'file': os.path.relpath(file_name, os.path.join(data_dir, '..', '..')),
+        'buses': buses,
+        'branches': branches,
+        'generators': len(case.gen),
+        'phases': best
+    }
+
+
+def scaling_exponent(results, phase):
+    '''Returns: the slope of a least squares fit of log(wall time) against
+    log(buses), i.e. k in time ~ buses^k, None with less than two sizes'''
+    points = [(math.log(result['buses']), math.log(result['phases'][phase]['wall']))
+        for result in results if result['buses'] > 0 and phase in result['phases'] and result['phases'][phase]['wall'] > 0]
+    if len(set(x for x, y in points)) < 2:
+        return None
+    mean_x = sum(x for x, y in points)/len(points)
+    mean_y = sum(y for x, y in points)/len(points)
+    covariance = sum((x-mean_x)*(y-mean_y) for x, y in points)
+    variance = sum((x-mean_x)**2 for x, y in points)
+    return covariance/variance
+
+
+def git_commit():
+    try:
+        output = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.realpath(__file__)), stderr=subprocess.DEVNULL)
+        return output.decode('utf-8').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(results, previous=None):
+    '''prints a table of wall times and throughputs, one row per case and
+    phase, with the ratio to previous results of the same case when given'''
+    previous_by_file = {}
+    if previous is not None:
+        previous_by_file = {result['file']: result for result in previous['cases']}
+
+    width = max([len('case')] + [len(os.path.basename(result['file'])) for result in results])
+    header = '%-*s %6s %-20s %10s %10s %12s %14s' % (width, 'case', 'buses', 'phase', 'wall (ms)', 'cpu (ms)', 'peak (KiB)', 'buses/s')
+    if previous is not None:
+        header += ' %8s' % 'vs prev'
+    print(header)
+
+    for result in sorted(results, key=lambda result: (result['buses'], result['file'])):
+        for phase in phases:
+            if phase not in result['phases']:
+                continue
+            timing = result['phases'][phase]
+            peak = 'n/a' if timing['peak'] is None else '%.1f' % (timing['peak']/1024.0)
+            line = '%-*s %6d %-20s %10.3f %10.3f %12s %14.0f' % (width, os.path.basename(result['file']), result['buses'], phase,
+                timing['wall']*1000.0, timing['cpu']*1000.0, peak, timing['buses_per_second'] or 0)
+            if previous is not None:
+                old = previous_by_file.get(result['file'], {}).get('phases', {}).get(phase)
+                line += ' %8s' % ('-' if old is None else '%.2fx' % (timing['wall']/old['wall']))
+            print(line)
+
+    print('')
+    print('%-20s %10s' % ('phase', 'scaling'))
+    for phase in phases:
+        exponent = scaling_exponent(results, phase)
+        print('%-20s %10s' % (phase, '-' if exponent is None else 'buses^%.2f' % exponent))
+
+
+def main(args):
+    case_files = grg_mp2grg.io.find_case_files(args.paths or default_paths)
+    case_files = [file_name for file_name, output_name in case_files if file_name.endswith('.m')]
+
+    results = []
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for file_name in case_files:
+            try:
+                results.append(bench_case(file_name, args.repeat, not args.skip_validation))
+            except Exception as error:
+                print('skipping {}: {}'.format(file_name, error), file=sys.stderr)
+
+    previous = None
+    if args.compare is not None:
+        with open(args.compare, 'r') as previous_file:
+            previous = json.load(previous_file)
+    report(results, previous)
+
+    if args.output is not None:
+        document = {
+            'grg_mp2grg': grg_mp2grg.__version__,
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'cases': results,
+            'scaling': {phase: scaling_exponent(results, phase) for phase in phases}
+        }
+        with open(args.output, 'w') as output_file:
+            json.dump(document, output_file, indent=2, sort_keys=True)
+
+
+def build_cli_parser():
+    parser = argparse.ArgumentParser(description='benchmarks the grg_mp2grg conversion phases on matpower cases')
+    parser.add_argument('paths', help='matpower files, directories or glob patterns', nargs='*')
+    parser.add_argument('--repeat', help='the number of timed runs of each case, after an untimed one, the best is kept', type=int, default=3)
+    parser.add_argument('--skip-validation', help='omits the grg validation phase, which dominates the run time', default=False, action='store_true')
+    parser.add_argument('--output', help='writes the results to this json file', default=None)
+    parser.add_argument('--compare', help='a json file of earlier results to compare with', default=None)
+    return parser
+
+
+if __name__ == '__main__':
+    main(build_cli_parser().parse_args())
@@ -0,0 +1,49 @@
+'''measures the memory used per component row by the default and the
+__slots__ based (compact) grg_mp2grg component classes
+
+usage: python benchmarks/bench_row_memory.py [matpower file] [repeat]
+'''
+
+from __future__ import print_function
+
+import os, sys, tracemalloc
+
+import grg_mp2grg
+from grg_mp2grg.struct import _row_builders, _compact_row_builders
+
+default_case = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+    '..', 'tests', 'data', 'correct', 'pglib-opf', 'pglib_opf_case588_sdet.m')
+
+
+def row_data(case, field):
+    '''Returns: the matpower row values of a case field'''
+    table = grg_mp2grg.struct.ComponentTable.from_rows(field, getattr(case, field))
+    return [[column[index] for column in table.columns.values()] for index in range(len(table))]
+
+
+def bytes_per_row(builder, rows, repeat):
+    '''Returns: the memory retained per object built from the rows'''
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [builder(index, data) for _ in range(repeat) for index, data in enumerate(rows)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return float(after - before)/len(objects)
+
+
+def main(file_name, repeat):
+    case = grg_mp2grg.io.parse_mp_case_file(file_name)
+    print('%-8s %8s %12s %12s' % ('field', 'rows', 'default (B)', 'compact (B)'))
+    for field in ['bus', 'gen', 'branch', 'gencost', 'dcline']:
+        if getattr(case, field) is None or len(getattr(case, field)) == 0:
+            continue
+        rows = row_data(case, field)
+        default = bytes_per_row(_row_builders[field], rows, repeat)
+        compact = bytes_per_row(_compact_row_builders[field], rows, repeat)
+        print('%-8s %8d %12.1f %12.1f' % (field, len(rows)*repeat, default, compact))
+
+
+if __name__ == '__main__':
+    file_name = sys.argv[1] if len(sys.argv) > 1 else default_case
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    main(file_name, repeat)
@@ -0,0 +1,77 @@
+'''measures how the conversion phases scale on synthetic cases of growing
+size, built by tiling a matpower case with grg_mp2grg.synthetic, after
+one untimed run on the case itself, each phase reports the best of repeat
+runs
+
+usage: python benchmarks/bench_scaling.py [matpower file] [bus counts ...]
+'''
+
+from __future__ import print_function
+
+import io, math, os, sys, warnings
+
+import grg_mp2grg
+from grg_mp2grg.synthetic import tile_case_to_size
+from grg_mp2grg.timings import Timings
+
+default_case = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+    '..', 'tests', 'data', 'correct', 'pglib-opf', 'pglib_opf_case588_sdet.m')
+
+phases = ['parse_mp_case_lines', 'to_grg', 'build_mp_case']
+
+repeat = 3
+
+
+def run_phases(mp_text, timings):
+    '''runs each phase once on the text of a matpower case, recording it in
+    timings'''
+    with timings.phase('parse_mp_case_lines'):
+        parsed = grg_mp2grg.io.parse_mp_case_lines(io.StringIO(mp_text))
+    with timings.phase('to_grg'):
+        grg_data = parsed.to_grg(skip_validation=True)
+    with timings.phase('build_mp_case'):
+        grg_mp2grg.io.build_mp_case(grg_data)
+
+
+def bench_size(case, buses):
+    '''Returns: the size of a tiling of case with at least the given number
+    of buses, and the best wall time of each phase on it over repeat runs'''
+    tiled = tile_case_to_size(case, buses)
+    mp_text = tiled.to_matpower()
+
+    best = {}
+    for _ in range(repeat):
+        timings = Timings(trace_memory=False)
+        run_phases(mp_text, timings)
+        for phase in timings.report():
+            best[phase['phase']] = min(phase['wall'], best.get(phase['phase'], phase['wall']))
+
+    return len(tiled.bus), best
+
+
+def main(file_name, sizes):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        case = grg_mp2grg.io.parse_mp_case_file(file_name)
+
+        # untimed, so lazy imports and first call costs are not charged to
+        # the smallest size
+        run_phases(case.to_matpower(), Timings(trace_memory=False))
+
+        print('%10s %-20s %10s %12s %10s' % ('buses', 'phase', 'wall (s)', 'us/bus', 'exponent'))
+        previous = None
+        for size in sizes:
+            buses, walls = bench_size(case, size)
+            for phase in phases:
+                exponent = '-'
+                if previous is not None:
+                    # the local slope of log(time) against log(buses)
+                    exponent = '%.2f' % (math.log(walls[phase]/previous[1][phase])/math.log(float(buses)/previous[0]))
+                print('%10d %-20s %10.3f %12.2f %10s' % (buses, phase, walls[phase], 1e6*walls[phase]/buses, exponent))
+            previous = (buses, walls)
+
+
+if __name__ == '__main__':
+    file_name = sys.argv[1] if len(sys.argv) > 1 else default_case
+    sizes = [int(size) for size in sys.argv[2:]] or [1000, 10000, 100000]
+    main(file_name, sizes)
@@ -1,7 +1,28 @@
 """a package for converting matpower data files to grg data files"""
 
-# import standard entry points to the code
-from grg_mp2grg import io
-from grg_mpdata import exception
+import importlib
+import sys
 
 __version__ = '0.1.2'
+
+# standard entry points to the code, these are imported on first use
+# (e.g. grg_mp2grg.io), so that importing the package stays cheap
+_entry_points = {
+    'io': 'grg_mp2grg.io',
+    'exception': 'grg_mpdata.exception'
+}
+
+def __getattr__(name):
+    if name in _entry_points:
+        module = importlib.import_module(_entry_points[name])
+        globals()[name] = module
+        return module
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+def __dir__():
+    return sorted(list(globals().keys()) + list(_entry_points.keys()))
+
+# module level __getattr__ requires python 3.7
+if sys.version_info < (3, 7):
+    from grg_mp2grg import io
+    from grg_mpdata import exception
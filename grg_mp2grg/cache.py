@@ -0,0 +1,116 @@
+'''a content addressed on-disk cache of parsed matpower cases'''
+
+import hashlib
+import os
+
+from grg_mp2grg.common import LazyModule
+
+# only needed once a cache is used, tempfile also imports shutil, bz2 and lzma
+pickle = LazyModule('pickle')
+tempfile = LazyModule('tempfile')
+
+
+class ParseCache(object):
+    def __init__(self, cache_dir, max_size=2**30):
+        '''Stores parsed cases in cache_dir, keyed by a hash of the source
+        file contents and the grg_mp2grg version.  Entries are pickled and the
+        least recently used ones are removed once the cache exceeds max_size.
+
+        Args:
+            cache_dir (str): the cache directory, created if it does not exist
+            max_size (int): upper bound on the total size of the cache (bytes)
+        '''
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+
+    def key(self, file_name, *options):
+        '''Returns: the cache key of a file, given the parsing options'''
+        digest = hashlib.sha256()
+        version = __import__('grg_mp2grg').__version__
+        digest.update(('grg_mp2grg %s %r\n' % (version, options)).encode('utf-8'))
+        with open(file_name, 'rb') as source:
+            for block in iter(lambda: source.read(2**20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key+'.pickle')
+
+    def get(self, key):
+        '''Returns: the cached case for key, None if there is no entry'''
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as entry:
+                case = pickle.load(entry)
+        except (IOError, OSError):
+            return None
+        except Exception:
+            # a damaged entry is dropped and treated as a miss
+            self._remove(path)
+            return None
+
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return case
+
+    def put(self, key, case):
+        '''stores a case under key and evicts old entries if needed'''
+        handle, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as entry:
+                pickle.dump(case, entry, pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self._path(key))
+        except:
+            self._remove(temp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        '''removes the least recently used entries until the cache fits in
+        max_size'''
+        if self.max_size is None:
+            return
+
+        entries = []
+        total_size = 0
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.endswith('.pickle'):
+                path = os.path.join(self.cache_dir, file_name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_size += stat.st_size
+
+        for mtime, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            self._remove(path)
+            total_size -= size
+
+    def clear(self):
+        '''removes all entries from the cache'''
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.endswith('.pickle'):
+                self._remove(os.path.join(self.cache_dir, file_name))
+
+    def parse(self, file_name, parser, *options):
+        '''Returns: the cached case for file_name, calling
+        parser(file_name, *options) and caching the result on a miss'''
+        key = self.key(file_name, *options)
+        case = self.get(key)
+        if case is None:
+            case = parser(file_name, *options)
+            self.put(key, case)
+        return case
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,109 @@
+'''a collection of data structures shared by the grg_mp2grg modules'''
+
+import importlib
+
+
+# every LazyModule that has been created, see load_lazy_modules
+_lazy_modules = []
+
+class LazyModule(object):
+    def __init__(self, name):
+        '''A stand in for a module, which imports the module on the first
+        access to one of its attributes.  It defers the cost of importing
+        heavy dependencies (e.g. grg_grgdata, which loads jsonschema) until
+        they are needed.
+
+        Args:
+            name (str): the absolute name of the module
+        '''
+        self._name = name
+        self._module = None
+        _lazy_modules.append(self)
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __repr__(self):
+        return '<lazy module {}>'.format(self._name)
+
+
+def load_lazy_modules():
+    '''imports the modules of all LazyModule stand ins created so far, for
+    long running processes (e.g. the conversion server) that should pay
+    the import cost up front rather than on their first conversion'''
+    for lazy_module in _lazy_modules:
+        lazy_module._load()
+
+
+class DisjointSet(object):
+    def __init__(self, items=()):
+        '''A union-find index over hashable items, using path compression and
+        union by rank.  Every item starts in a set of its own.
+
+        Args:
+            items: the initial items of the index
+        '''
+        self._parent = {}
+        self._rank = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        '''adds item to the index as a singleton set, if it is not present'''
+        if item not in self._parent:
+            self._parent[item] = item
+            self._rank[item] = 0
+
+    def find(self, item):
+        '''Returns: the representative item of the set containing item'''
+        parent = self._parent
+
+        root = item
+        while parent[root] != root:
+            root = parent[root]
+
+        while parent[item] != root:
+            parent[item], item = root, parent[item]
+
+        return root
+
+    def union(self, item_1, item_2):
+        '''merges the sets containing item_1 and item_2
+
+        Returns: the representative item of the merged set
+        '''
+        root_1 = self.find(item_1)
+        root_2 = self.find(item_2)
+        if root_1 == root_2:
+            return root_1
+
+        if self._rank[root_1] < self._rank[root_2]:
+            root_1, root_2 = root_2, root_1
+
+        self._parent[root_2] = root_1
+        if self._rank[root_1] == self._rank[root_2]:
+            self._rank[root_1] += 1
+
+        return root_1
+
+    def sets(self):
+        '''Returns: the disjoint sets as sorted lists of items, ordered by
+        their smallest item'''
+        members = {}
+        for item in self._parent:
+            members.setdefault(self.find(item), []).append(item)
+        return sorted((sorted(items) for items in members.values()), key=lambda x: x[0])
+
+    def __contains__(self, item):
+        return item in self._parent
+
+    def __iter__(self):
+        return iter(self._parent)
+
+    def __len__(self):
+        return len(self._parent)
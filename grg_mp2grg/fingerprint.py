@@ -0,0 +1,121 @@
+'''content hashes of grg data documents and of the sections of matpower
+cases, for keying caches and for finding the parts of large cases that
+changed'''
+
+import hashlib
+import json
+import sys
+
+from collections import OrderedDict
+from json.encoder import encode_basestring_ascii
+
+
+# the compact sorted json encoding, which is what value_fingerprint hashes
+_canonical_encode = json.JSONEncoder(sort_keys=True, separators=(',', ':')).encode
+
+# the number of members of a dict or list that are encoded at once
+_chunk_items = 64
+
+_json_containers = (dict, list, tuple)
+
+
+def value_fingerprint(value):
+    '''Returns: a sha256 hex digest of a json value (e.g. a section of a grg
+    data document), which does not depend on the order of dictionary keys'''
+    digest = hashlib.sha256()
+    _feed_value(value, digest)
+    return digest.hexdigest()
+
+
+def _feed_value(value, digest):
+    '''passes the compact sorted json encoding of value to the digest in
+    pieces.  Dicts and lists with more than _chunk_items members are encoded
+    a slice of members at a time, and members of that size are fed on their
+    own, so the json encoder still does the work but the encoding of a whole
+    section is never built.'''
+    is_dict = isinstance(value, dict)
+    if is_dict:
+        keys = sorted(value)
+        members = list(map(value.__getitem__, keys))
+    elif isinstance(value, _json_containers):
+        members = value
+    else:
+        members = ()
+
+    large = [index for index, member in enumerate(members)
+        if isinstance(member, _json_containers) and len(member) > _chunk_items]
+    if len(members) <= _chunk_items and len(large) == 0:
+        digest.update(_canonical_encode(value).encode('utf-8'))
+        return
+
+    separator = '{' if is_dict else '['
+    start = 0
+    for end in large + [len(members)]:
+        for slice_start in range(start, end, _chunk_items):
+            slice_end = min(slice_start+_chunk_items, end)
+            if is_dict:
+                part = dict(zip(keys[slice_start:slice_end], members[slice_start:slice_end]))
+            else:
+                part = members[slice_start:slice_end]
+            # drops the brackets of the slice, the members are in place
+            digest.update((separator+_canonical_encode(part)[1:-1]).encode('utf-8'))
+            separator = ','
+
+        if end < len(members):
+            prefix = encode_basestring_ascii(keys[end])+':' if is_dict else ''
+            digest.update((separator+prefix).encode('utf-8'))
+            separator = ','
+            _feed_value(members[end], digest)
+        start = end+1
+
+    digest.update(b'}' if is_dict else b']')
+
+
+def combine_fingerprints(fingerprints):
+    '''Returns: a sha256 hex digest of a dictionary of named fingerprints'''
+    digest = hashlib.sha256()
+    for name in sorted(fingerprints):
+        digest.update(('%d:%s%s' % (len(name), name, fingerprints[name])).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def grg_fingerprints(grg_data):
+    '''Returns: a fingerprint of each section of a grg data document, by
+    section name, each mapping is a section of its own named
+    mappings/<mapping id>, e.g.
+        {'network': ..., 'groups': ..., 'mappings/starting_points': ...}
+    '''
+    fingerprints = OrderedDict()
+    for name in sorted(grg_data):
+        if name == 'mappings' and isinstance(grg_data[name], dict):
+            for mapping_id in sorted(grg_data[name]):
+                fingerprints['mappings/'+mapping_id] = value_fingerprint(grg_data[name][mapping_id])
+        else:
+            fingerprints[name] = value_fingerprint(grg_data[name])
+    return fingerprints
+
+
+def grg_fingerprint(grg_data):
+    '''Returns: a fingerprint of a whole grg data document'''
+    return combine_fingerprints(grg_fingerprints(grg_data))
+
+
+def table_fingerprint(table):
+    '''Returns: a sha256 hex digest of a ComponentTable, computed from the
+    bytes of its columns, which are stored little endian'''
+    digest = hashlib.sha256()
+    digest.update(('%s %d\n' % (table.field, len(table))).encode('utf-8'))
+    for name, column in table.columns.items():
+        digest.update(('%s %s\n' % (name, column.typecode)).encode('utf-8'))
+        if sys.byteorder == 'big':
+            column = column[:]
+            column.byteswap()
+        digest.update(column.tobytes())
+    return digest.hexdigest()
+
+
+def changed_sections(fingerprints, other_fingerprints):
+    '''Returns: the sorted names of the sections that differ between two
+    dictionaries of fingerprints, including sections only in one of them'''
+    names = set(fingerprints) | set(other_fingerprints)
+    return sorted(name for name in names if fingerprints.get(name) != other_fingerprints.get(name))
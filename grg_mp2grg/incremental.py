@@ -0,0 +1,220 @@
+'''incremental updates of matpower cases built from grg data, for studies
+that only change switch statuses between conversions'''
+
+import copy
+
+from grg_mp2grg.io import build_mp_case
+from grg_mp2grg.io import _mp_bus_type
+from grg_mp2grg.mapping import MappingIndex
+from grg_mp2grg.topology import TopologyCache
+
+
+class IncrementalMPCase(object):
+    def __init__(self, grg_data, mapping_ids=None, add_gen_costs=False, add_bus_names=False, mapping_index=None, topology_cache=None):
+        '''A matpower case built from a grg data document, see build_mp_case,
+        which can be updated when the status of some switches change.  Only
+        the components next to the toggled switches are revisited, unless a
+        switch between two buses changes, in which case the buses are merged
+        differently and the case is rebuilt.
+
+        Args:
+            grg_data (dict): the grg data document, it must not be modified
+                while this case or its updates are in use
+            mapping_ids (list, optional): the mappings used for set points
+                and statuses, defaults to all mappings
+            other arguments are as in build_mp_case
+        '''
+        if mapping_index is None:
+            mapping_index = MappingIndex(grg_data)
+        if topology_cache is None:
+            topology_cache = TopologyCache()
+        # the network does not change between updates, so it is only
+        # fingerprinted once
+        topology_cache = topology_cache.for_network(grg_data)
+        if mapping_ids is None:
+            mapping_ids = mapping_index.mapping_ids()
+
+        self.grg_data = grg_data
+        self.mapping_ids = list(mapping_ids)
+        self.options = {'add_gen_costs': add_gen_costs, 'add_bus_names': add_bus_names}
+        self.mapping_index = mapping_index
+        self.topology_cache = topology_cache
+        self.status_changes = {}
+
+        self._switching = None
+        self._build()
+
+    def _build(self):
+        mapping_ids = list(self.mapping_ids)
+        if len(self.status_changes) > 0:
+            mapping_ids.append({'{}/status'.format(component_id): status for component_id, status in self.status_changes.items()})
+
+        status_assignment = self.mapping_index.status_assignment(mapping_ids)
+        self.status_assignment = dict(status_assignment)
+
+        self.topology = self.topology_cache.get(self.grg_data, status_assignment)
+        self.active_voltage_points = self.topology.active_voltage_points
+        self.isolated_voltage_points = self.topology.isolated_voltage_points
+        self.case = build_mp_case(self.grg_data, mapping_ids, mapping_index=self.mapping_index, topology_cache=self.topology_cache, **self.options)
+
+        self._positions = None
+
+    def with_statuses(self, status_changes):
+        '''Returns: a new IncrementalMPCase, whose case is this case with the
+        given component statuses (e.g. {'switch_1': 'off'}) applied.  This
+        case is not modified.'''
+        updated = copy.copy(self)
+        updated.status_changes = dict(self.status_changes)
+        updated.status_changes.update(status_changes)
+        updated.status_assignment = dict(self.status_assignment)
+        updated.status_assignment.update(status_changes)
+
+        if self.case is None:
+            return updated
+
+        switching = self._switching_index()
+        toggled = []
+        for component_id in status_changes:
+            switch = switching.switches.get(component_id)
+            if switch is not None and \
+                switching.is_on(switch, self.status_assignment) != switching.is_on(switch, updated.status_assignment):
+                toggled.append(switch)
+
+        if len(toggled) == 0:
+            return updated
+
+        if any(switching.is_bus_pair(switch) for switch in toggled):
+            updated._build()
+        else:
+            updated._patch(toggled)
+        return updated
+
+    def _switching_index(self):
+        if self._switching is None:
+            self._switching = _SwitchingIndex(self.topology.components)
+        return self._switching
+
+    def _row_positions(self):
+        '''Returns: the position of each row of the case by its matpower
+        index, and the grg generators of each matpower bus'''
+        if self._positions is None:
+            gens_by_bid = {}
+            for comp_type in ('generator', 'synchronous_condenser'):
+                for gen in self.topology.components[comp_type]:
+                    gens_by_bid.setdefault(self.topology.bus_numbers[gen['link']], []).append(gen)
+
+            self._positions = {
+                'gens_by_bid': gens_by_bid,
+                'bus': {bus.bus_i: i for i, bus in enumerate(self.case.bus)},
+                'gen': {gen.index: i for i, gen in enumerate(self.case.gen)},
+                'branch': {branch.index: i for i, branch in enumerate(self.case.branch)},
+                'dcline': {dcline.index: i for i, dcline in enumerate(self.case.dcline or [])}
+            }
+        return self._positions
+
+    def _patch(self, toggled):
+        switching = self._switching_index()
+        topology = self.topology
+        status = self.status_assignment
+
+        avps = switching.active_voltage_points(status)
+        ivps = set(self.isolated_voltage_points)
+        for vp in set(link for switch in toggled for link in (switch['link_1'], switch['link_2'])):
+            if vp in switching.bus_vps:
+                if vp in switching.component_vps or \
+                    any(switching.is_on(switch, status) for switch in switching.switches_by_vp[vp]):
+                    ivps.discard(vp)
+                else:
+                    ivps.add(vp)
+
+        active_changes = avps ^ self.active_voltage_points
+        isolated_changes = ivps ^ self.isolated_voltage_points
+        self.active_voltage_points = avps
+        self.isolated_voltage_points = ivps
+
+        case = copy.copy(self.case)
+        case.bus = list(case.bus)
+        case.gen = list(case.gen)
+        case.branch = list(case.branch)
+        if case.dcline is not None:
+            case.dcline = list(case.dcline)
+        self.case = case
+
+        positions = self._row_positions()
+        index_lookups = topology.index_lookups
+        retype_bids = set(topology.bus_numbers[vp] for vp in isolated_changes)
+
+        for comp in switching.components_at(active_changes):
+            if comp['type'] in ('ac_line', 'two_winding_transformer', 'dc_line'):
+                br_status = 1 if comp['link_1'] in avps and comp['link_2'] in avps else 0
+                field = 'dcline' if comp['type'] == 'dc_line' else 'branch'
+                _update_row(getattr(case, field), positions[field].get(index_lookups[field][comp['id']]), 'br_status', br_status)
+            else:
+                gen_status = 1 if comp['link'] in avps else 0
+                _update_row(case.gen, positions['gen'].get(index_lookups['gen'][comp['id']]), 'gen_status', gen_status)
+                retype_bids.add(topology.bus_numbers[comp['link']])
+
+        for bid in retype_bids:
+            buses = topology.buses_by_bid[bid]
+            active_gen = any(gen['link'] in avps for gen in positions['gens_by_bid'].get(bid, []))
+            bid_with_active_gen = set([bid]) if active_gen else set()
+            bus_type = _mp_bus_type(bid, buses, bid_with_active_gen, ivps)
+            _update_row(case.bus, positions['bus'].get(bid), 'bus_type', bus_type)
+
+
+def _update_row(rows, position, attribute, value):
+    if position is None or getattr(rows[position], attribute) == value:
+        return
+    row = copy.copy(rows[position])
+    setattr(row, attribute, value)
+    rows[position] = row
+
+
+class _SwitchingIndex(object):
+    def __init__(self, cbt):
+        '''the parts of a grg network that are needed to update the active and
+        isolated voltage points, following grg_grgdata.cmd'''
+        self.switch_list = cbt['switch']
+        self.switches = {switch['id']: switch for switch in self.switch_list}
+        self.bus_vps = set(bus['link'] for bus in cbt['bus'])
+
+        self.switches_by_vp = {}
+        for switch in self.switch_list:
+            for link in (switch['link_1'], switch['link_2']):
+                self.switches_by_vp.setdefault(link, []).append(switch)
+
+        self.component_vps = set()
+        self.components_by_vp = {}
+        for comp_type, comps in cbt.items():
+            if comp_type == 'bus' or comp_type == 'switch':
+                continue
+            for comp in comps:
+                for link_name in ('link', 'link_1', 'link_2'):
+                    if link_name in comp:
+                        self.component_vps.add(comp[link_name])
+                        if comp_type in ('generator', 'synchronous_condenser', 'ac_line', 'two_winding_transformer', 'dc_line'):
+                            self.components_by_vp.setdefault(comp[link_name], []).append(comp)
+
+    def is_on(self, switch, status_assignment):
+        return switch['status'] == 'on' or status_assignment.get(switch['id']) == 'on'
+
+    def is_bus_pair(self, switch):
+        return switch['link_1'] in self.bus_vps and switch['link_2'] in self.bus_vps
+
+    def active_voltage_points(self, status_assignment):
+        active_vps = set(self.bus_vps)
+        for switch in self.switch_list:
+            if self.is_on(switch, status_assignment):
+                if switch['link_1'] in active_vps:
+                    active_vps.add(switch['link_2'])
+                if switch['link_2'] in active_vps:
+                    active_vps.add(switch['link_1'])
+        return active_vps
+
+    def components_at(self, vps):
+        seen = set()
+        for vp in vps:
+            for comp in self.components_by_vp.get(vp, []):
+                if comp['id'] not in seen:
+                    seen.add(comp['id'])
+                    yield comp
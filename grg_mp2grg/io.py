@@ -3,171 +3,502 @@
 from __future__ import print_function
 
 import warnings
-import itertools
-import numbers
-import copy
-import argparse
 import math
 import json
 import functools
+import io
+import importlib
 import sys
+import os
+import re
+import glob
+import time
+import traceback
+
+from collections import OrderedDict
 
 from grg_mpdata.exception import MPDataParsingError
 from grg_mpdata.exception import MPDataValidationError
 from grg_mpdata.exception import MPDataWarning
-from grg_mp2grg.exception import MP2GRGWarning
 
-from grg_mpdata.io import _parse_matrix
+from grg_mpdata.io import _split_line
 from grg_mpdata.io import _extract_assignment_line
 
-from grg_mpdata.cmd import diff
-
-from grg_grgdata.cmd import flatten_network
-from grg_grgdata.cmd import components_by_type
-from grg_grgdata.cmd import collapse_voltage_points
-from grg_grgdata.cmd import active_voltage_points
-from grg_grgdata.cmd import isolated_voltage_points
-from grg_grgdata.cmd import voltage_level_by_voltage_point
-
 from grg_mp2grg.struct import Bus
 from grg_mp2grg.struct import Generator
 from grg_mp2grg.struct import GeneratorCost
 from grg_mp2grg.struct import Branch
 from grg_mp2grg.struct import DCLine
-from grg_mp2grg.struct import Bus
 from grg_mp2grg.struct import Case
+from grg_mp2grg.struct import ComponentTable
+from grg_mp2grg.struct import _row_builders
+from grg_mp2grg.struct import _compact_row_builders
+from grg_mp2grg.cache import ParseCache
+from grg_mp2grg.mapping import MappingIndex
+from grg_mp2grg.topology import Topology
+from grg_mp2grg.topology import TopologyCache
+from grg_mp2grg.timings import Timings
+from grg_mp2grg.timings import no_timings
 
 from grg_mpdata.struct import BusName
 
 import grg_mp2grg.common as common
-import grg_grgdata.common as grg_common
+
+# grg_grgdata loads jsonschema on import, which dominates the import time of
+# this module, so it is only imported when grg data is first used
+grg_common = common.LazyModule('grg_grgdata.common')
+# grg_mpdata.cmd (and argparse) are only needed to print case differences
+grg_mpdata_cmd = common.LazyModule('grg_mpdata.cmd')
 
 
 print_err = functools.partial(print, file=sys.stderr)
 
-def parse_mp_case_file(mpFileName):
-    '''opens the given path and parses it as matpower data
+
+# compressed file extensions and the modules that stream them
+_compression_modules = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'lzma'}
+
+def _open_file(file_name, mode='r'):
+    '''opens a text file for reading or writing, streaming it through gzip,
+    bz2 or lzma when its name ends with .gz, .bz2 or .xz'''
+    compression = os.path.splitext(file_name)[1]
+    if compression in _compression_modules:
+        module = importlib.import_module(_compression_modules[compression])
+        return module.open(file_name, mode+'t')
+    return open(file_name, mode)
+
+
+def _split_case_extension(file_name):
+    '''Returns: the base name, the extension and the compression extension
+    of a case file name (e.g. ('case', '.m', '.gz') for 'case.m.gz'), the
+    compression extension is empty for uncompressed files'''
+    base_name, extension = os.path.splitext(file_name)
+    compression = ''
+    if extension in _compression_modules:
+        compression = extension
+        base_name, extension = os.path.splitext(base_name)
+    return base_name, extension, compression
+
+def parse_mp_case_file(mpFileName, columnar=False, compact=False, cache=None, timings=None):
+    '''opens the given path and parses it as matpower data, reading the
+    file incrementally rather than loading all of its lines at once
 
     Args:
         mpFileName(str): path to the a matpower data file
+        columnar(bool): store components in ComponentTables
+        compact(bool): build components with the __slots__ based classes
+        cache(ParseCache): a parse cache to read from and store to, parsing
+            warnings are only issued when a case is not in the cache
+        timings(Timings): records the cost of parsing and validation, no
+            phases are recorded when the case is found in the cache
     Returns:
         Case: a mpdata case
     '''
-    mpFile = open(mpFileName, 'r')
-    lines = mpFile.readlines()
-    return parse_mp_case_lines(lines)
+    if cache is not None:
+        parser = functools.partial(parse_mp_case_file, timings=timings)
+        return cache.parse(mpFileName, parser, columnar, compact)
 
+    with _open_file(mpFileName, 'r') as mpFile:
+        return parse_mp_case_lines(mpFile, columnar, compact, timings)
 
-def parse_grg_case_file(grg_file_name):
+
+def parse_grg_case_file(grg_file_name, sections=None, mapping_ids=None):
     '''opens the given path and parses it as json data
 
     Args:
         grg_file_name(str): path to the a json data file
+        sections(list): the top level sections to load (e.g. ['network',
+            'groups']), defaults to all sections
+        mapping_ids(list): the mappings to load, defaults to all mappings.
+            Items that are not mapping ids (e.g. mapping dictionaries) are
+            ignored, so the mappings argument of build_mp_case can be given
+            as is.
     Returns:
         Dict: a dictionary case
+
+    When sections or mapping_ids are given, the file is read in chunks and
+    the sections and mappings that are not requested are scanned past
+    without being decoded or kept in memory, see parse_grg_stream.
     '''
 
     # TODO validate format via grg_grgdata library!
-    with open(grg_file_name, 'r') as grg_data:
-        data = json.load(grg_data)
-        grg_data.close()
+    with _open_file(grg_file_name, 'r') as grg_data:
+        if sections is None and mapping_ids is None:
+            return json.load(grg_data)
+        return parse_grg_stream(grg_data, sections, mapping_ids)
+
 
+def parse_grg_text(text, sections=None, mapping_ids=None):
+    '''parses a json string as grg data, decoding only the requested
+    sections and mappings, see parse_grg_case_file
+
+    Returns:
+        Dict: a dictionary case
+    '''
+    if sections is None and mapping_ids is None:
+        return json.loads(text)
+    return parse_grg_stream(io.StringIO(text), sections, mapping_ids)
+
+
+def parse_grg_stream(grg_file, sections=None, mapping_ids=None, chunk_size=None):
+    '''parses a text file object as grg data, decoding only the requested
+    sections and mappings, see parse_grg_case_file.  The file is read in
+    chunks and values are decoded one at a time, skipped sections and
+    mappings are dropped as soon as they are decoded, so neither the text
+    of the document nor its skipped parts are held at once.  Reading takes
+    about as long as json.load, the savings are in memory, and in the
+    mapping index of build_mp_case, which only sees the requested mappings.
+
+    Args:
+        grg_file: a file object open in text mode
+        sections, mapping_ids: as in parse_grg_case_file
+        chunk_size(int): the number of characters read at a time
+    Returns:
+        Dict: a dictionary case
+    '''
+    select = None if sections is None else set(sections)
+    select_members = {}
+    if mapping_ids is not None:
+        if select is not None:
+            select.add('mappings')
+        select_members['mappings'] = set(mapping_id for mapping_id in mapping_ids if isinstance(mapping_id, str))
+
+    reader = _JSONReader(grg_file, chunk_size)
+    data = _read_json_object(reader, select, select_members, True)
+    if reader.peek() != '':
+        raise ValueError('extra data after the grg document')
     return data
 
 
-# TODO see if there is away not to replicate this code
-def parse_mp_case_lines(mpLines):
-    '''parses a list of strings as matpower data
+_json_decoder = json.JSONDecoder()
+_json_whitespace_expr = re.compile(r'[ \t\n\r]*')
+_json_number_characters = set('0123456789+-.eE')
+
+class _JSONReader(object):
+    def __init__(self, json_file, chunk_size=None):
+        '''reads json text from a file object in chunks, only the text from
+        the current position on is kept'''
+        self.json_file = json_file
+        self.chunk_size = chunk_size if chunk_size is not None else 1 << 20
+        self.text = ''
+        self.position = 0
+        self.eof = False
+
+    def _more(self):
+        '''Returns: False when the end of the file has been reached'''
+        if self.eof:
+            return False
+        chunk = self.json_file.read(self.chunk_size)
+        if len(chunk) == 0:
+            self.eof = True
+            return False
+        self.text = self.text[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def peek(self):
+        '''Returns: the next character after any whitespace, '' at the end'''
+        while True:
+            self.position = _json_whitespace_expr.match(self.text, self.position).end()
+            if self.position < len(self.text) or not self._more():
+                return self.text[self.position:self.position+1]
+
+    def expect(self, characters):
+        '''Returns: the next character, which must be one of characters'''
+        character = self.peek()
+        if character == '' or character not in characters:
+            raise ValueError('expected one of {} in the json data, given {!r}'.format(characters, character))
+        self.position += 1
+        return character
+
+    def read_value(self):
+        '''Returns: the next json value, decoded'''
+        self.peek()
+        while True:
+            try:
+                value, end = _json_decoder.raw_decode(self.text, self.position)
+                # a number at the end of the text may continue in the next chunk
+                if self.eof or (end < len(self.text) and self.text[end] not in _json_number_characters):
+                    self.position = end
+                    return value
+            except ValueError:
+                if self.eof:
+                    raise
+            # the value continues past the text read so far, the text is at
+            # least doubled before decoding again
+            available = len(self.text) - self.position
+            while len(self.text) - self.position < 2*available and self._more():
+                pass
+
+
+def _read_json_object(reader, select, select_members={}, split_skipped=False):
+    '''reads a json object, only the members whose keys are in select (all
+    if it is None) are kept, the others are skipped.  The members of the
+    values of the keys in select_members are selected in the same way.
+    When split_skipped is set, skipped objects are dropped one member at a
+    time rather than decoded whole.
+
+    Returns: the decoded dictionary
+    '''
+    reader.expect('{')
+    data = {}
+    if reader.peek() == '}':
+        reader.position += 1
+        return data
+
+    while True:
+        if reader.peek() != '"':
+            raise ValueError('expected a json object key')
+        key = reader.read_value()
+        reader.expect(':')
+
+        if key in select_members:
+            data[key] = _read_json_object(reader, select_members[key])
+        elif select is None or key in select:
+            data[key] = reader.read_value()
+        elif split_skipped and reader.peek() == '{':
+            # decoding and dropping values is faster than scanning past them
+            # in python, a skipped section is dropped one member at a time
+            _read_json_object(reader, set())
+        else:
+            reader.read_value()
+
+        if reader.expect(',}') == '}':
+            return data
+
+
+# matpower matrix names and the case field they populate
+_mp_matrices = {
+    'mpc.bus': 'bus',
+    'mpc.gen': 'gen',
+    'mpc.branch': 'branch',
+    'mpc.dcline': 'dcline',
+    'mpc.gencost': 'gencost',
+}
+
+
+def _matrix_name(assignment_line):
+    assert('=' in assignment_line)
+    return assignment_line.split('%')[0].split('=', 1)[0].strip()
+
+
+def _matrix_body_lines(assignment_line, mp_lines):
+    '''yields the body of a matlab matrix one line at a time, consuming lines
+    from the given iterator until the closing bracket is found.  Follows the
+    conventions of grg_mpdata.io._parse_matrix, comments are removed and
+    each line is terminated with a row separator.
 
     Args:
-        mpLines(list): the list of matpower data strings
+        assignment_line(str): the line where the matrix assignment starts
+        mp_lines: an iterator over the remaining matpower data strings
+    '''
+    assert('=' in assignment_line)
+    assignment_parts = assignment_line.split('%')[0].strip().split('=', 1)
+    assignment_rhs = assignment_parts[1].strip()
+
+    yield assignment_rhs
+    if ']' in assignment_rhs:
+        return
+
+    for line in mp_lines:
+        line = line.strip()
+        if len(line) == 0 or line.startswith('%'):
+            continue
+
+        line = line.split('%')[0]
+
+        if ';' in line:
+            yield line
+        else:
+            yield line + ';'
+
+        if ']' in line:
+            return
+
+
+def _matrix_row_strings(body_lines):
+    pending = None
+
+    for line in body_lines:
+        if pending is None:
+            pending = ''
+            line = line.strip().lstrip('[')
+        parts = (pending + ' ' + line.replace('];', '')).split(';')
+        pending = parts.pop()
+
+        for part in parts:
+            if len(part.split()) > 0:
+                yield part
+
+    if pending is not None and len(pending.split()) > 0:
+        yield pending
+
+
+def _matrix_rows(body_lines):
+    '''splits the body lines of a matlab matrix into rows of tokens
+
+    Args:
+        body_lines: an iterable of matrix body lines, as produced by
+            _matrix_body_lines
     Returns:
-        Case: a grg_mp2grg case
+        a generator of rows, each row is a list of string tokens
     '''
+    return _checked_rows(_split_line(row_string) for row_string in _matrix_row_strings(body_lines))
+
+
+def _checked_rows(rows):
+    '''passes rows of tokens through, checking they have the same length'''
+    columns = None
+
+    for row in rows:
+        if columns is not None:
+            if columns != len(row):
+                raise MPDataParsingError('matlab matrix parsing error, '
+                    'inconsistent number of items in each row.  Expected %d '
+                    'given %d.' % (columns, len(row)))
+        else:
+            columns = len(row)
+        yield row
 
-    version = None
-    name = None
-    baseMVA = None
 
-    bus = None
-    gen = None
-    branch = None
-    gencost = None
-    dcline = None
+def _build_matrix(field, body_lines, columnar=False, compact=False):
+    '''converts the body lines of a matpower data matrix into components
+
+    Returns: a list of component objects, or a ComponentTable if columnar
+    '''
+    return _build_rows(field, _matrix_rows(body_lines), columnar, compact)
+
+
+def _build_rows(field, rows, columnar=False, compact=False):
+    '''converts rows of tokens of a matpower data matrix into components
+
+    Returns: a list of component objects, or a ComponentTable if columnar
+    '''
+    builder = (_compact_row_builders if compact else _row_builders)[field]
 
-    parsed_matrixes = []
+    if columnar:
+        table = ComponentTable(field, builder)
+        for data in rows:
+            table.append(data)
+        return table
 
-    last_index = len(mpLines)
-    index = 0
-    while index < last_index:
-        line = mpLines[index].strip()
+    return [builder(index, data) for index, data in enumerate(rows)]
+
+
+def parse_mp_case_lines(mpLines, columnar=False, compact=False, timings=None):
+    '''parses an iterable of strings as matpower data in a single pass.
+    Component rows are built as each matrix is read, so the input can be a
+    file object and the full list of lines is never required.
+
+    Args:
+        mpLines(iterable): the matpower data strings
+        columnar(bool): store components in ComponentTables, one typed
+            array per matpower column, instead of lists of objects
+        compact(bool): build components with the __slots__ based classes
+            (e.g. CompactBus), which do not carry a per object __dict__
+        timings(Timings): records the 'parse' phase, which includes reading
+            the lines, and the 'validate' phase
+    Returns:
+        Case: a grg_mp2grg case
+    '''
+    if timings is None:
+        timings = no_timings
+    timings.start('parse')
+
+    header = {'name': None, 'version': None, 'baseMVA': None}
+    components = dict((field, None) for field in _mp_matrices.values())
+
+    mp_lines = iter(mpLines)
+    for line in mp_lines:
+        line = line.strip()
         if len(line) == 0 or line.startswith('%'):
-            index += 1
             continue
 
-        if 'function mpc' in line:
-            name = _extract_assignment_line(line).val
-        elif 'mpc.version' in line:
-            version = _extract_assignment_line(line).val
-        elif 'mpc.baseMVA' in line:
-            baseMVA = float(_extract_assignment_line(line).val)
+        if _parse_header_line(line, header):
+            pass
         elif '[' in line:
-            matrix = _parse_matrix(mpLines, index)
-            parsed_matrixes.append(matrix)
-            index += matrix['line_count']-1
-        index += 1
+            matrix_name = _matrix_name(line)
+            body_lines = _matrix_body_lines(line, mp_lines)
 
-    for parsed_matrix in parsed_matrixes:
-        if parsed_matrix['name'] == 'mpc.bus':
-            bus = [Bus(*data) for data in parsed_matrix['data']]
+            if matrix_name in _mp_matrices:
+                field = _mp_matrices[matrix_name]
+                components[field] = _build_matrix(field, body_lines, columnar, compact)
+            else:
+                for body_line in body_lines:
+                    pass
+                warnings.warn('unrecognized data matrix named \'%s\': data was '
+                    'ignored' % matrix_name, MPDataWarning)
 
-        elif parsed_matrix['name'] == 'mpc.gen':
-            gen = [Generator(index, *data)
-                   for index, data in enumerate(parsed_matrix['data'])]
+    return _finish_case(header, components, timings)
 
-        elif parsed_matrix['name'] == 'mpc.branch':
-            branch = [Branch(index, *data)
-                      for index, data in enumerate(parsed_matrix['data'])]
 
-        elif parsed_matrix['name'] == 'mpc.dcline':
-            dcline = [DCLine(index, *data)
-                      for index, data in enumerate(parsed_matrix['data'])]
+def _parse_header_line(line, header):
+    '''reads the case name, version or base MVA from a matpower line into
+    header
 
-        elif parsed_matrix['name'] == 'mpc.gencost':
-            gencost = []
-            for index, data in enumerate(parsed_matrix['data']):
-                gencost.append(GeneratorCost(index, *data[:4], cost=data[4:]))
+    Returns: True if the line is one of these assignments
+    '''
+    if 'function mpc' in line:
+        header['name'] = _extract_assignment_line(line).val
+    elif 'mpc.version' in line:
+        header['version'] = _extract_assignment_line(line).val
+    elif 'mpc.baseMVA' in line:
+        header['baseMVA'] = float(_extract_assignment_line(line).val)
+    else:
+        return False
+    return True
 
-        else:
-            warnings.warn('unrecognized data matrix named \'%s\': data was '
-                'ignored' % parsed_matrix['name'], MPDataWarning)
 
-    case = Case(name, version, baseMVA, bus, gen, branch, gencost, dcline)
+def _finish_case(header, components, timings):
+    '''builds and validates a case, ending the 'parse' phase'''
+    case = Case(header['name'], header['version'], header['baseMVA'], components['bus'], components['gen'],
+        components['branch'], components['gencost'], components['dcline'])
+    timings.stop()
 
-    case.validate()
+    with timings.phase('validate'):
+        case.validate()
 
     return case
 
 
-def build_mp_case(grg_data, mapping_ids=None, add_gen_costs=False, add_bus_names=False):
+# the mapping values of components that do not appear in any mapping
+_no_mapping = {}
+
+def build_mp_case(grg_data, mapping_ids=None, add_gen_costs=False, add_bus_names=False, timings=None, mapping_index=None, topology_cache=None, fingerprint=None):
+    '''builds a matpower case from a grg data document
+
+    Args:
+        grg_data(dict): the grg data document
+        mapping_ids(list): the mappings used for set points and statuses,
+            defaults to all mappings
+        add_gen_costs(bool): adds generator costs, if they do not exist
+        add_bus_names(bool): adds matpower bus names, based on grg bus ids
+        timings(Timings): records the cost of each build phase
+        mapping_index(MappingIndex): an index of the mappings of grg_data,
+            which can be shared by several calls on the same document
+        topology_cache(TopologyCache): reuses the network topology of
+            earlier calls with the same network and statuses.  The cache is
+            keyed by a fingerprint of the network and groups sections, which
+            the cache computes once per document and then finds by the
+            identity of those sections, so grg_data must not be modified in
+            place between calls without invalidating the cache
+        fingerprint(str): the network fingerprint of grg_data, see
+            topology.network_fingerprint
+    Returns:
+        Case: a grg_mp2grg case
+    '''
     # TODO see if this grg_mp2grg case is ok, and should not be grg_mpdata
+    if timings is None:
+        timings = no_timings
 
     #print(json.dumps(flat_components, sort_keys=True, indent=2, separators=(',', ': ')))
 
     # TODO this functionality should be in grg data structure (components-by-type)
     float_precision = grg_common.default_float_precision
 
-    if mapping_ids == None:
-        mapping_ids = grg_data['mappings'].keys()
+    if mapping_index is None:
+        mapping_index = MappingIndex(grg_data)
 
-    master_mapping = {}
-    for mid in mapping_ids:
-        for (k,v) in grg_data['mappings'][mid].items():
-            if k in master_mapping:
-                assert(isinstance(master_mapping[k], dict) and isinstance(v, dict))
-                master_mapping[k].update(v)
-            else:
-                master_mapping[k] = v
+    component_mapping = mapping_index.merge(mapping_ids)
 
     operations = None
     if 'operation_constraints' in grg_data:
@@ -185,75 +516,32 @@ def build_mp_case(grg_data, mapping_ids=None, add_gen_costs=False, add_bus_names
     if 'base_mva' in grg_data['network']:
         base_mva = grg_data['network']['base_mva']
 
-    cbt = components_by_type(grg_data)
-    # print_err('comps: {}'.format(cbt.keys()))
-
-    status_assignment = {}
-    for key, value in master_mapping.items():
-        if key.count('/') == 1 and key.endswith('/status'):
-            status_assignment[key.split('/')[0]] = value
-
-    vp2int = collapse_voltage_points(grg_data, status_assignment)
-    # print_err('voltage points to int:')
-    # print_err(vp2int)
+    status_assignment = mapping_index.status_assignment(mapping_ids)
 
-    avps = active_voltage_points(grg_data, status_assignment)
-    # print_err('active voltage points:')
-    # print_err(avps)
+    if topology_cache is not None:
+        topology = topology_cache.get(grg_data, status_assignment, timings, fingerprint)
+    else:
+        topology = Topology(grg_data, status_assignment, timings)
 
-    ivps = isolated_voltage_points(grg_data, status_assignment)
-    # print_err('isolated voltage points:')
-    # print_err(ivps)
+    cbt = topology.components
+    vp2int = topology.bus_numbers
+    avps = topology.active_voltage_points
+    ivps = topology.isolated_voltage_points
+    vlbvp = topology.voltage_levels
 
-    vlbvp = voltage_level_by_voltage_point(grg_data)
-    #print_err(vlbvp)
+    buses_by_bid = topology.buses_by_bid
+    loads_by_bid = topology.loads_by_bid
+    shunts_by_bid = topology.shunts_by_bid
+    bid_with_active_gen = topology.bid_with_active_gen
 
-    if all('source_id' in bus for bus in cbt['bus']):
-        # TODO check for clashes with other voltage point ints
-        number_update = {}
-        for bus in cbt['bus']:
-            number_update[vp2int[bus['link']]] = int(bus['source_id'])
-            #vp2int[bus['link']] = int(bus['source_id'])
+    area_index_lookup = topology.index_lookups['area']
+    zone_index_lookup = topology.index_lookups['zone']
+    branch_index_lookup = topology.index_lookups['branch']
+    gen_index_lookup = topology.index_lookups['gen']
+    dcline_index_lookup = topology.index_lookups['dcline']
 
-        for k,v in vp2int.items():
-            if v in number_update:
-                vp2int[k] = number_update[v]
-    else:
-        # make 1 based, becouse required by matpower
-        for k,v in vp2int.items():
-            vp2int[k] = v+1
-
-
-    buses_by_bid = {}
-    for bus in cbt['bus']:
-        bid = vp2int[bus['link']]
-        if not bid in buses_by_bid:
-            buses_by_bid[bid] = []
-        buses_by_bid[bid].append(bus)
-
-    loads_by_bid = {}
-    for load in cbt['load']:
-        bid = vp2int[load['link']]
-        if not bid in loads_by_bid:
-            loads_by_bid[bid] = []
-        loads_by_bid[bid].append(load)
-
-    shunts_by_bid = {}
-    for shunt in cbt['shunt']:
-        bid = vp2int[shunt['link']]
-        if not bid in shunts_by_bid:
-            shunts_by_bid[bid] = []
-        shunts_by_bid[bid].append(shunt)
-
-    bid_with_active_gen = set()
-    for gen in cbt['generator']:
-        if gen['link'] in avps:
-            bid_with_active_gen.add(vp2int[gen['link']])
-
-    for sc in cbt['synchronous_condenser']:
-        if sc['link'] in avps:
-            bid_with_active_gen.add(vp2int[sc['link']])
 
+    timings.start('bus build')
     mp_buses = []
     mp_gens = []
     mp_branches = []
@@ -262,51 +550,6 @@ def build_mp_case(grg_data, mapping_ids=None, add_gen_costs=False, add_bus_names
     mp_dclinecosts = None
     mp_busnames = None
 
-    if 'groups' in grg_data:
-        areas = {k:grp for k,grp in grg_data['groups'].items() if grp['type'] == 'area'}
-        zones = {k:grp for k,grp in grg_data['groups'].items() if grp['type'] == 'zone'}
-    else:
-        areas = {}
-        zones = {}
-
-    area_index_lookup = {}
-    if all('source_id' in area for k,area in areas.items()):
-        for k,area in areas.items():
-            for comp_id in area['component_ids']:
-                if not comp_id in area_index_lookup:
-                    area_index_lookup[comp_id] = int(area['source_id'])
-                else:
-                    warnings.warn('component %s is in multiple areas only %s will be used.' % (comp_id, area_index_lookup[comp_id]), MP2GRGWarning)
-    else:
-        idx = 1
-        for k,area in areas.items():
-            for comp_id in area['component_ids']:
-                if not comp_id in area_index_lookup:
-                    area_index_lookup[comp_id] = idx
-                else:
-                    warnings.warn('component %s is in multiple areas only %s will be used.' % (comp_id, area_index_lookup[comp_id]), MP2GRGWarning)
-
-            idx += 1
-
-    zone_index_lookup = {}
-    if all('source_id' in zone for k,zone in zones.items()):
-        for k,zone in zones.items():
-            for comp_id in zone['component_ids']:
-                if not comp_id in zone_index_lookup:
-                    zone_index_lookup[comp_id] = int(zone['source_id'])
-                else:
-                    warnings.warn('component %s is in multiple zones only %s will be used.' % (comp_id, zone_index_lookup[comp_id]), MP2GRGWarning)
-    else:
-        idx = 1
-        for k,zone in zones.items():
-            for comp_id in zone['component_ids']:
-                if not comp_id in zone_index_lookup:
-                    zone_index_lookup[comp_id] = idx
-                else:
-                    warnings.warn('component %s is in multiple zones only %s will be used.' % (comp_id, zone_index_lookup[comp_id]), MP2GRGWarning)
-            idx += 1
-
-
     if add_bus_names:
         mp_busnames = []
 
@@ -314,25 +557,7 @@ def build_mp_case(grg_data, mapping_ids=None, add_gen_costs=False, add_bus_names
         if len(buses) > 1:
             print_err('warning: merging buses {} into 1'.format(len(buses)))
 
-        bus_type = None
-
-        if bid in bid_with_active_gen:
-            bus_type = 2
-
-        if any(bus['link'] in ivps for bus in buses):
-            bus_type = 4
-
-        if any('reference' in bus for bus in buses):
-            bus_type = 3
-
-        if bus_type == None:
-            bus_type = 1
-
-        for bus in buses:
-            if 'matpower_bus_type' in bus:
-                if bus['matpower_bus_type'] != bus_type:
-                    # TODO print warning about inconsistent mp data!
-                    bus_type = bus['matpower_bus_type']
+        bus_type = _mp_bus_type(bid, buses, bid_with_active_gen, ivps)
 
         active_load = 0
         reactive_load = 0
@@ -345,18 +570,18 @@ def build_mp_case(grg_data, mapping_ids=None, add_gen_costs=False, add_bus_names
                 if not grg_common.is_abstract(load['demand']['active']):
                     active_load += load['demand']['active']
                 else:
-                    key = '{}/demand'.format(load['id'])
-                    if key in master_mapping:
-                        active_load += master_mapping[key]['active']
+                    load_mapping = component_mapping.get(load['id'], _no_mapping)
+                    if 'demand' in load_mapping:
+                        active_load += load_mapping['demand']['active']
                     else:
                         print_err('warning: unable to find active power value for load {}'.format(load['id']))
 
                 if not grg_common.is_abstract(load['demand']['reactive']):
                     reactive_load += sum([load['demand']['reactive'] for load in loads])
                 else:
-                    key = '{}/demand'.format(load['id'])
-                    if key in master_mapping:
-                        reactive_load += master_mapping[key]['reactive']
+                    load_mapping = component_mapping.get(load['id'], _no_mapping)
+                    if 'demand' in load_mapping:
+                        reactive_load += load_mapping['demand']['reactive']
                     else:
                         print_err('warning: unable to find reactive power value for load {}'.format(load['id']))
 
@@ -419,9 +644,9 @@ def build_mp_case(grg_data, mapping_ids=None, add_gen_costs=False, add_bus_names
         vm_values = []
         va_values = []
         for bus in buses:
-            key = '{}/voltage'.format(bus['id'])
-            if key in master_mapping:
-                voltage = master_mapping[key]
+            bus_mapping = component_mapping.get(bus['id'], _no_mapping)
+            if 'voltage' in bus_mapping:
+                voltage = bus_mapping['voltage']
                 if 'magnitude' in voltage:
                     vm_values.append(voltage['magnitude'])
                 if 'angle' in voltage:
@@ -472,25 +697,10 @@ def build_mp_case(grg_data, mapping_ids=None, add_gen_costs=False, add_bus_names
         mp_busnames.sort(key=lambda x: x.index)
 
     mp_bus_lookup = {bus.bus_i:bus for bus in mp_buses}
+    timings.stop()
 
 
-    branch_index_lookup = {}
-    if all('source_id' in line for line in cbt['ac_line']) and \
-        all('source_id' in xfer for xfer in cbt['two_winding_transformer']):
-        for line in cbt['ac_line']:
-            branch_index_lookup[line['id']] = int(line['source_id'])
-        for xfer in cbt['two_winding_transformer']:
-            branch_index_lookup[xfer['id']] = int(xfer['source_id'])
-    else:
-        offset = 0
-        for i, k in enumerate(sorted(cbt['ac_line'], key=lambda x: x['id'])):
-            branch_index_lookup[k['id']] = i+offset 
-
-        offset = len(cbt['ac_line'])
-        for i, k in enumerate(sorted(cbt['two_winding_transformer'], key=lambda x: x['id'])):
-            branch_index_lookup[k['id']] = i+offset 
-
-
+    timings.start('branch build')
     for i, line in enumerate(cbt['ac_line']):
         from_bus_id = vp2int[line['link_1']]
         to_bus_id = vp2int[line['link_2']]
@@ -579,9 +789,9 @@ def build_mp_case(grg_data, mapping_ids=None, add_gen_costs=False, add_bus_names
         if xfer['link_1'] not in avps or xfer['link_2'] not in avps:
             br_status = 0
 
-        key = '{}/tap_changer/position'.format(xfer['id'])
-        if key in master_mapping:
-            tap_position = master_mapping[key]
+        xfer_mapping = component_mapping.get(xfer['id'], _no_mapping)
+        if 'tap_changer/position' in xfer_mapping:
+            tap_position = xfer_mapping['tap_changer/position']
         else:
             print_err('warning: skipping transformer {} due to missing tap position setting'.format(xfer['id']))
             continue
@@ -652,24 +862,10 @@ def build_mp_case(grg_data, mapping_ids=None, add_gen_costs=False, add_bus_names
         mp_branches.append(mp_branch)
         del xfer
     mp_branches.sort(key=lambda x: x.index)
+    timings.stop()
 
 
-    gen_index_lookup = {}
-    if all('source_id' in gen for gen in cbt['generator']) and \
-        all('source_id' in syn_cond for syn_cond in cbt['synchronous_condenser']):
-        for gen in cbt['generator']:
-            gen_index_lookup[gen['id']] = int(gen['source_id'])
-        for syn_cond in cbt['synchronous_condenser']:
-            gen_index_lookup[syn_cond['id']] = int(syn_cond['source_id'])
-    else:
-        offset = 0
-        for i, k in enumerate(sorted(cbt['generator'], key=lambda x: x['id'])):
-            gen_index_lookup[k['id']] = i+offset 
-
-        offset = len(cbt['generator'])
-        for i, k in enumerate(sorted(cbt['synchronous_condenser'], key=lambda x: x['id'])):
-            gen_index_lookup[k['id']] = i+offset 
-
+    timings.start('gen build')
     has_cost_functions = market != None and len(market['operational_costs']) > 0
 
     if has_cost_functions:
@@ -680,9 +876,9 @@ def build_mp_case(grg_data, mapping_ids=None, add_gen_costs=False, add_bus_names
 
         pg = 0.0
         qg = 0.0
-        key = '{}/output'.format(gen['id'])
-        if key in master_mapping:
-            output = master_mapping[key]
+        gen_mapping = component_mapping.get(gen['id'], _no_mapping)
+        if 'output' in gen_mapping:
+            output = gen_mapping['output']
             if 'active' in output:
                 pg = output['active']
             if 'reactive' in output:
@@ -760,9 +956,9 @@ def build_mp_case(grg_data, mapping_ids=None, add_gen_costs=False, add_bus_names
 
         pg = 0.0
         qg = 0.0
-        key = '{}/output'.format(syn_cond['id'])
-        if key in master_mapping:
-            output = master_mapping[key]
+        syn_cond_mapping = component_mapping.get(syn_cond['id'], _no_mapping)
+        if 'output' in syn_cond_mapping:
+            output = syn_cond_mapping['output']
             if 'reactive' in output:
                 qg = output['reactive']
 
@@ -841,21 +1037,13 @@ def build_mp_case(grg_data, mapping_ids=None, add_gen_costs=False, add_bus_names
 
     if mp_gencosts != None:
         mp_gencosts.sort(key=lambda x: x.index)
+    timings.stop()
 
 
 
     if len(cbt['dc_line']) > 0:
+        timings.start('dcline build')
         mp_dclines = []
-        
-        dcline_index_lookup = {}
-        if all('source_id' for dcline in cbt['dc_line']):
-            for dcline in cbt['dc_line']:
-                dcline_index_lookup[dcline['id']] = int(dcline['source_id'])
-        else:
-            offset = 0
-            for i, k in enumerate(sorted(cbt['dc_line'], key=lambda x: x['id'])):
-                dcline_index_lookup[k['id']] = i+offset 
-
 
         for dcline in cbt['dc_line']:
             from_bus_id = vp2int[dcline['link_1']]
@@ -868,9 +1056,9 @@ def build_mp_case(grg_data, mapping_ids=None, add_gen_costs=False, add_bus_names
             pf = 0.0
             qf = 0.0
             vf = 0.0
-            key = '{}/output_1'.format(dcline['id'])
-            if key in master_mapping:
-                output = master_mapping[key]
+            dcline_mapping = component_mapping.get(dcline['id'], _no_mapping)
+            if 'output_1' in dcline_mapping:
+                output = dcline_mapping['output_1']
                 if 'active' in output:
                     pf = output['active']
                 if 'reactive' in output:
@@ -881,9 +1069,8 @@ def build_mp_case(grg_data, mapping_ids=None, add_gen_costs=False, add_bus_names
             pt = 0.0
             qt = 0.0
             vt = 0.0
-            key = '{}/output_2'.format(dcline['id'])
-            if key in master_mapping:
-                output = master_mapping[key]
+            if 'output_2' in dcline_mapping:
+                output = dcline_mapping['output_2']
                 if 'active' in output:
                     pt = output['active']
                 if 'reactive' in output:
@@ -923,6 +1110,7 @@ def build_mp_case(grg_data, mapping_ids=None, add_gen_costs=False, add_bus_names
             mp_dclines.append(mp_dcline)
             del dcline
         mp_dclines.sort(key=lambda x: x.index)
+        timings.stop()
 
 
     print_err('grg buses: {}'.format(len(cbt['bus'])))
@@ -933,6 +1121,134 @@ def build_mp_case(grg_data, mapping_ids=None, add_gen_costs=False, add_bus_names
     return case
 
 
+def _mp_bus_type(bid, buses, bid_with_active_gen, ivps):
+    '''Returns: the matpower type of the bus that merges the given grg buses'''
+    bus_type = None
+
+    if bid in bid_with_active_gen:
+        bus_type = 2
+
+    if any(bus['link'] in ivps for bus in buses):
+        bus_type = 4
+
+    if any('reference' in bus for bus in buses):
+        bus_type = 3
+
+    if bus_type == None:
+        bus_type = 1
+
+    for bus in buses:
+        if 'matpower_bus_type' in bus:
+            if bus['matpower_bus_type'] != bus_type:
+                # TODO print warning about inconsistent mp data!
+                bus_type = bus['matpower_bus_type']
+
+    return bus_type
+
+
+def build_mp_cases(grg_data, scenarios, add_gen_costs=False, add_bus_names=False, mapping_index=None, topology_cache=None, workers=None):
+    '''builds a matpower case for each of several scenarios of a grg data
+    document, sharing the mapping index, topology analysis, component
+    grouping and index lookups between them
+
+    Args:
+        grg_data(dict): the grg data document, it must not be modified while
+            the cases are built
+        scenarios: a dictionary of scenario names to scenarios, or a list of
+            scenarios named 'scenario_1', 'scenario_2', ...  A scenario is a
+            list of mapping ids and mapping dictionaries, see
+            MappingIndex.merge
+        add_gen_costs(bool): adds generator costs, if they do not exist
+        add_bus_names(bool): adds matpower bus names, based on grg bus ids
+        mapping_index(MappingIndex): an index of the mappings of grg_data
+        topology_cache(TopologyCache): a cache to share with other calls,
+            when workers are used each worker process extends its own copy
+        workers(int): build the cases in a pool of this many processes.  The
+            document is passed to each worker once, by fork where the
+            platform supports it, and only scenarios and cases are sent
+            between processes.
+    Returns:
+        a generator of (scenario name, Case) pairs, in scenario order
+    '''
+    sweep = _Sweep(grg_data, {'add_gen_costs': add_gen_costs, 'add_bus_names': add_bus_names}, mapping_index, topology_cache)
+    return sweep.run(scenarios, workers)
+
+
+class _Sweep(object):
+    def __init__(self, grg_data, options, mapping_index=None, topology_cache=None, output_dir=None):
+        if mapping_index is None:
+            mapping_index = MappingIndex(grg_data)
+        if topology_cache is None:
+            topology_cache = TopologyCache()
+
+        self.grg_data = grg_data
+        self.options = options
+        self.mapping_index = mapping_index
+        self.topologies = topology_cache.for_network(grg_data)
+        self.output_dir = output_dir
+
+    def run(self, scenarios, workers=None):
+        if not isinstance(scenarios, dict):
+            scenarios = OrderedDict(('scenario_{}'.format(i), scenario) for i, scenario in enumerate(scenarios, 1))
+        scenarios = list(scenarios.items())
+
+        if workers is None or workers <= 1 or len(scenarios) <= 1:
+            for scenario in scenarios:
+                yield self.build(scenario)
+            return
+
+        context = _process_context()
+        chunk_size = max(1, len(scenarios)//(4*workers))
+        pool = context.Pool(min(workers, len(scenarios)), _init_sweep_worker, (self,))
+        try:
+            for result in pool.imap(_build_sweep_scenario, scenarios, chunk_size):
+                yield result
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def build(self, scenario):
+        name, mapping_ids = scenario
+        case = build_mp_case(self.grg_data, mapping_ids, mapping_index=self.mapping_index, topology_cache=self.topologies, **self.options)
+        if self.output_dir is None:
+            return name, case
+        return name, _write_mp_case_file(self.output_dir, name, case)
+
+
+def _scenario_mapping_ids(scenarios):
+    '''Returns: the mapping ids used by any of the given scenarios (see
+    build_mp_cases), or None when a scenario uses all mappings'''
+    if isinstance(scenarios, dict):
+        scenarios = scenarios.values()
+    mapping_ids = []
+    for scenario in scenarios:
+        if scenario is None:
+            return None
+        mapping_ids.extend(mapping_id for mapping_id in scenario if isinstance(mapping_id, str))
+    return mapping_ids
+
+
+def _process_context():
+    '''Returns: the multiprocessing context of worker pools, fork where the
+    platform supports it, so that workers inherit the parent's data'''
+    import multiprocessing
+
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+
+# the sweep of a worker process, see _Sweep.run
+_worker_sweep = None
+
+def _init_sweep_worker(sweep):
+    global _worker_sweep
+    _worker_sweep = sweep
+
+def _build_sweep_scenario(scenario):
+    return _worker_sweep.build(scenario)
+
+
 def currents_to_mvas(currents, from_bus, to_bus):
     vmax = max(from_bus.vmax, to_bus.vmax)
     return [c*vmax for c in currents]
@@ -1011,6 +1327,40 @@ def build_gen_cost_mp_losses(index, model_type, degree):
 
 
 
+_json_encoder = json.JSONEncoder(sort_keys=True, indent=2, separators=(',', ': '))
+
+# nesting depth of json objects that are written one item at a time,
+# deep enough to reach the components of a voltage level
+_json_stream_depth = 7
+
+def _iter_json(value, level, depth):
+    if depth <= 0 or not isinstance(value, dict) or len(value) == 0 or \
+        not all(isinstance(key, str) for key in value):
+        yield _json_encoder.encode(value).replace('\n', '\n' + '  '*level)
+        return
+
+    separator = '{'
+    for key in sorted(value):
+        yield separator + '\n' + '  '*(level+1) + _json_encoder.encode(key) + ': '
+        for chunk in _iter_json(value[key], level+1, depth-1):
+            yield chunk
+        separator = ','
+    yield '\n' + '  '*level + '}'
+
+
+def write_grg_json(grg_data, output_file):
+    '''writes grg data as json to a file object one component at a time,
+    the result is identical to json.dumps(grg_data, sort_keys=True, indent=2,
+    separators=(',', ': ')) without building the complete string in memory
+
+    Args:
+        grg_data (dict): the grg data to write out
+        output_file: a writable text file object
+    '''
+    for chunk in _iter_json(grg_data, 0, _json_stream_depth):
+        output_file.write(chunk)
+
+
 def write_json_case_file(output_file_location, case):
     '''writes a grg data json file
 
@@ -1019,10 +1369,193 @@ def write_json_case_file(output_file_location, case):
         case (Case): the data structure to write out
     '''
 
-    output_file = open(output_file_location, 'w')
-    output_file.write(json.dumps(case.to_grg(), sort_keys=True, indent=2, \
-                         separators=(',', ': ')))
-    output_file.close()
+    with _open_file(output_file_location, 'w') as output_file:
+        write_grg_json(case.to_grg(), output_file)
+
+def write_mp_case_files(output_dir, grg_data, scenarios, add_gen_costs=False, add_bus_names=False, mapping_index=None, topology_cache=None, workers=None):
+    '''builds a matpower case for each scenario of a grg data document and
+    writes it to output_dir as <scenario name>.m, one case at a time.  When
+    workers are used, each worker process writes the cases it builds.
+
+    Args:
+        output_dir (str): the directory to write, created if needed
+        grg_data (dict): the grg data document
+        scenarios: the scenarios to build, see build_mp_cases
+        other arguments are as in build_mp_cases
+    Returns:
+        list: the paths of the written files, in scenario order
+    '''
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+
+    sweep = _Sweep(grg_data, {'add_gen_costs': add_gen_costs, 'add_bus_names': add_bus_names}, mapping_index, topology_cache, output_dir)
+    return [file_name for name, file_name in sweep.run(scenarios, workers) if file_name is not None]
+
+
+def _write_mp_case_file(output_dir, name, case):
+    if case is None:
+        return None
+    file_name = os.path.join(output_dir, name+'.m')
+    with open(file_name, 'w') as output_file:
+        output_file.write(case.to_matpower())
+        output_file.write('\n')
+    return file_name
+
+
+# the extensions of the case files converted in batch mode and the
+# extension of their conversions
+_batch_extensions = {'.m': '.json', '.json': '.m'}
+
+def find_case_files(paths):
+    '''expands directories and glob patterns into the matpower and grg case
+    files they contain, which may be compressed (e.g. case.m.gz),
+    directories are searched recursively
+
+    Args:
+        paths (list): file paths, directories and glob patterns
+    Returns:
+        list: (file path, output name) pairs, where the output name is the
+            path of the file relative to the given directory or pattern
+            root, without an extension
+    '''
+    case_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            file_names = []
+            for dir_path, dir_names, dir_file_names in os.walk(path):
+                dir_names.sort()
+                file_names.extend(os.path.join(dir_path, file_name) for file_name in sorted(dir_file_names))
+            root = path
+        elif any(char in path for char in '*?['):
+            file_names = sorted(glob.glob(path, recursive=True))
+            root = None
+        else:
+            file_names = [path]
+            root = None
+
+        for file_name in file_names:
+            base_name, extension, compression = _split_case_extension(file_name)
+            if extension in _batch_extensions and os.path.isfile(file_name):
+                if root is None:
+                    output_name = os.path.basename(base_name)
+                else:
+                    output_name = os.path.relpath(base_name, root)
+                case_files.append((file_name, output_name))
+    return case_files
+
+
+def convert_case_file(file_name, output_file_name, mappings=None, omit_subtype=False, skip_validation=False, add_gen_costs=False, add_bus_names=False, cache=None):
+    '''converts a matpower file to grg json, or a grg json file to matpower,
+    based on its extension.  Failures are reported rather than raised, so
+    that one bad file does not stop a batch.
+
+    Args:
+        file_name (str): the .m or .json file to convert
+        output_file_name (str): the path of the converted file
+        mappings (list): the mappings used to build matpower cases
+        omit_subtype, skip_validation: as in Case.to_grg
+        add_gen_costs, add_bus_names: as in build_mp_case
+        cache (ParseCache): a parse cache for matpower files
+    Returns:
+        dict: a summary of the conversion, with the keys 'file', 'output',
+            'status' ('ok' or 'failed'), 'time' (seconds), 'size' (bytes
+            written), 'warnings' (count) and 'error' (None or a message)
+    '''
+    summary = {'file': file_name, 'output': output_file_name, 'status': 'ok', 'time': 0.0, 'size': 0, 'warnings': 0, 'error': None}
+    start = time.perf_counter()
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        try:
+            if _split_case_extension(file_name)[1] == '.m':
+                case = parse_mp_case_file(file_name, cache=cache)
+                grg_data = case.to_grg(omit_subtype, skip_validation)
+                if grg_data is None:
+                    raise MPDataValidationError('grg data of {} is not valid'.format(file_name))
+                with _open_file(output_file_name, 'w') as output_file:
+                    write_grg_json(grg_data, output_file)
+                    output_file.write('\n')
+            else:
+                grg_data = parse_grg_case_file(file_name, mapping_ids=mappings)
+                case = build_mp_case(grg_data, mappings, add_gen_costs=add_gen_costs, add_bus_names=add_bus_names)
+                with _open_file(output_file_name, 'w') as output_file:
+                    output_file.write(case.to_matpower())
+                    output_file.write('\n')
+            summary['size'] = os.path.getsize(output_file_name)
+        except Exception as error:
+            summary['status'] = 'failed'
+            summary['error'] = ''.join(traceback.format_exception_only(type(error), error)).strip()
+
+    summary['time'] = time.perf_counter() - start
+    summary['warnings'] = len(caught)
+    return summary
+
+
+def convert_case_files(paths, output_dir, workers=None, **options):
+    '''converts many matpower and grg case files into output_dir, see
+    find_case_files and convert_case_file.  Each file is written as
+    <output name>.json or <output name>.m, under the same relative path as
+    its source.  Compressed files are written with the same compression
+    (e.g. case.m.gz as case.json.gz).
+
+    Args:
+        paths (list): file paths, directories and glob patterns
+        output_dir (str): the directory to write, created if needed
+        workers (int): convert the files in a pool of this many processes
+        options: keyword arguments of convert_case_file
+    Returns:
+        a generator of conversion summaries, in file order
+    '''
+    jobs = []
+    for file_name, output_name in find_case_files(paths):
+        base_name, extension, compression = _split_case_extension(file_name)
+        jobs.append((file_name, os.path.join(output_dir, output_name+_batch_extensions[extension]+compression)))
+
+    for output_sub_dir in sorted(set(os.path.dirname(output_file_name) for file_name, output_file_name in jobs)):
+        if not os.path.isdir(output_sub_dir):
+            os.makedirs(output_sub_dir)
+
+    convert = functools.partial(_convert_case_job, options)
+    if workers is None or workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield convert(job)
+        return
+
+    context = _process_context()
+    pool = context.Pool(min(workers, len(jobs)))
+    try:
+        for summary in pool.imap(convert, jobs):
+            yield summary
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _convert_case_job(options, job):
+    file_name, output_file_name = job
+    return convert_case_file(file_name, output_file_name, **options)
+
+
+def batch_summary(summaries):
+    '''Returns: a table of conversion summaries, see convert_case_file, with
+    a line of totals'''
+    width = max([len('file')] + [len(summary['file']) for summary in summaries])
+    lines = ['%-*s %8s %10s %12s %9s' % (width, 'file', 'status', 'time (s)', 'size (KiB)', 'warnings')]
+    for summary in summaries:
+        lines.append('%-*s %8s %10.4f %12.1f %9d' % (width, summary['file'], summary['status'], summary['time'], summary['size']/1024.0, summary['warnings']))
+        if summary['error'] is not None:
+            lines.append('    {}'.format(summary['error']))
+
+    failed = sum(1 for summary in summaries if summary['status'] != 'ok')
+    lines.append('converted {} of {} files in {:.4f} seconds, {} warnings'.format(len(summaries)-failed, len(summaries),
+        sum(summary['time'] for summary in summaries), sum(summary['warnings'] for summary in summaries)))
+    return '\n'.join(lines)
+
+
+def _is_batch(args):
+    return os.path.isdir(args.file) or any(char in args.file for char in '*?[') or \
+        (args.output_dir is not None and args.scenarios is None)
+
 
 def test_idempotent(input_data_file):
     case = parse_mp_case_file(input_data_file)
@@ -1042,73 +1575,149 @@ def main(args):
         args: an argparse data structure
     '''
 
-    #start = time.time()
+    timings = Timings() if args.timings else no_timings
 
-    if args.file.endswith('.m'):
+    if _is_batch(args):
+        if args.output_dir is None:
+            print_err('batch conversion requires an output directory (--output-dir).')
+            return
+        if args.idempotent:
+            print_err('idempotent test not supported in batch conversion.')
+            return
+
+        cache = None
+        if args.cache_dir is not None:
+            cache = ParseCache(args.cache_dir, int(args.cache_size*2**20))
+        options = {
+            'mappings': args.mappings,
+            'omit_subtype': args.omit_subtypes,
+            'skip_validation': args.skip_validation,
+            'add_gen_costs': args.add_generator_costs,
+            'add_bus_names': args.add_bus_names,
+            'cache': cache
+        }
+        with timings.phase('batch'):
+            summaries = list(convert_case_files([args.file], args.output_dir, args.workers, **options))
+        print_err(batch_summary(summaries))
+        if args.timings:
+            print_err(timings)
+        return
+
+    extension = _split_case_extension(args.file)[1]
+
+    if extension == '.m':
         if not args.idempotent:
             print_err('translating: {}'.format(args.file))
-            case = parse_mp_case_file(args.file)
+            cache = None
+            if args.cache_dir is not None:
+                cache = ParseCache(args.cache_dir, int(args.cache_size*2**20))
+            case = parse_mp_case_file(args.file, cache=cache, timings=timings)
             #print_err('internal matpower representation:')
             #print(case)
-            #print(time.time() - start)
-            #start = time.time()
             #print('')
 
-            grg_data = case.to_grg(args.omit_subtypes, args.skip_validation)
+            with timings.phase('to_grg'):
+                grg_data = case.to_grg(args.omit_subtypes, args.skip_validation, timings)
             if grg_data != None:
                 #print_err('grg data representation:')
-                print(json.dumps(grg_data, sort_keys=True, indent=2, \
-                                separators=(',', ': ')))
-                #print(time.time() - start)
-                #print('')
+                with timings.phase('serialization'):
+                    if args.output is None:
+                        write_grg_json(grg_data, sys.stdout)
+                        print('')
+                    else:
+                        with _open_file(args.output, 'w') as output_file:
+                            write_grg_json(grg_data, output_file)
+                            output_file.write('\n')
+            if args.timings:
+                print_err(timings)
             return
         else:
             case1, case2 = test_idempotent(args.file)
             if case1 != case2:
-                diff(case1, case2)
+                grg_mpdata_cmd.diff(case1, case2)
                 #print(case1)
                 #print(case2)
             print_err('idempotent test: '+str(case1 == case2))
             return
 
 
-    if args.file.endswith('.json'):
+    if extension == '.json':
         if args.idempotent:
             print_err('idempotent test only supported on matpower files.')
             return
 
-        grg_data = parse_grg_case_file(args.file)
+        # only the mappings that are used are decoded
+        mapping_ids = args.mappings
+        if args.scenarios is not None:
+            if args.output_dir is None:
+                print_err('scenarios require an output directory (--output-dir).')
+                return
+            with open(args.scenarios, 'r') as scenarios_file:
+                scenarios = json.load(scenarios_file, object_pairs_hook=OrderedDict)
+            mapping_ids = _scenario_mapping_ids(scenarios)
+
+        with timings.phase('read'):
+            grg_data = parse_grg_case_file(args.file, mapping_ids=mapping_ids)
         #print_err('internal grg data representation:')
         #print_err(grg_data)
         #print_err('')
 
+        if args.scenarios is not None:
+            with timings.phase('build_mp_cases'):
+                file_names = write_mp_case_files(args.output_dir, grg_data, scenarios, add_gen_costs=args.add_generator_costs, add_bus_names=args.add_bus_names, workers=args.workers)
+            print_err('wrote {} matpower cases to {}'.format(len(file_names), args.output_dir))
+            if args.timings:
+                print_err(timings)
+            return
+
         print_err('working with mappings: {}'.format(args.mappings))
 
-        case = build_mp_case(grg_data, args.mappings, add_gen_costs=args.add_generator_costs, add_bus_names=args.add_bus_names)
+        with timings.phase('build_mp_case'):
+            case = build_mp_case(grg_data, args.mappings, add_gen_costs=args.add_generator_costs, add_bus_names=args.add_bus_names, timings=timings)
 
         print_err('matpower representation:')
-        print(case.to_matpower())
-        print('')
+        with timings.phase('to_matpower'):
+            mp_data = case.to_matpower()
+        if args.output is None:
+            print(mp_data)
+            print('')
+        else:
+            with _open_file(args.output, 'w') as output_file:
+                output_file.write(mp_data)
+                output_file.write('\n')
+        if args.timings:
+            print_err(timings)
         return
 
     print_err('file extension not recognized!')
 
 
 def build_cli_parser():
+    import argparse
+
     parser = argparse.ArgumentParser(
         description='''grg_mp2grg.%(prog)s is a tool for converting power 
             network dataset between the matpower and grg formats.
-            The converted file is printed to standard out''',
+            The converted file is printed to standard out, or when the file
+            is a directory or a glob pattern, each case file it matches is
+            converted into the output directory''',
 
         epilog='''Please file bugs at...''',
     )
-    parser.add_argument('file', help='the data file to operate on (.m|.json)')
+    parser.add_argument('file', help='the data file to operate on (.m|.json, optionally compressed as .gz|.bz2|.xz), or a directory or quoted glob pattern of data files')
+    parser.add_argument('-o', '--output', help='writes the converted file here instead of standard out, compressed based on its extension (.gz|.bz2|.xz)', default=None)
     parser.add_argument('-m', '--mappings', help='mappings to be use as a basis for the matpower case', nargs='*', type=str, default=None)
     parser.add_argument('-i', '--idempotent', help='tests the translation of a given matpower file is idempotent', action='store_true')
     parser.add_argument('-os', '--omit-subtypes', help='ommits optional component subtypes when translating from matpower to grg', default=False, action='store_true')
     parser.add_argument('-sv', '--skip-validation', help='skips the grg validation step when translating from matpower to grg', default=False, action='store_true')
     parser.add_argument('-agc', '--add-generator-costs', help='adds generator costs, if they do not exist', default=False, action='store_true')
     parser.add_argument('-abn', '--add-bus-names', help='adds matpower bus names, based on grg bus ids', default=False, action='store_true')
+    parser.add_argument('--cache-dir', help='caches parsed matpower files in the given directory', default=None)
+    parser.add_argument('--cache-size', help='the maximum size of the parse cache (MB)', type=float, default=1024)
+    parser.add_argument('--scenarios', help='a json file of scenario names and the mappings of each scenario, builds one matpower case per scenario from a grg file', default=None)
+    parser.add_argument('--output-dir', help='the directory where matpower cases of scenarios, or batch conversions, are written', default=None)
+    parser.add_argument('--workers', help='the number of worker processes used for scenarios and batch conversion', type=int, default=None)
+    parser.add_argument('--timings', help='reports the wall time, cpu time and peak allocations of each conversion phase on standard error', default=False, action='store_true')
 
     #parser.add_argument('--foo', help='foo help')
     version = __import__('grg_mp2grg').__version__
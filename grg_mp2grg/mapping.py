@@ -0,0 +1,125 @@
+'''indexes of grg data mappings, for fast per component value lookups'''
+
+from collections import ChainMap
+from collections.abc import Mapping
+
+
+class MappingIndex(object):
+    def __init__(self, grg_data):
+        '''An index of the mappings of a grg data document.  Each mapping key
+        (e.g. 'gen_1/output') is split once into a component id and an
+        attribute path ('gen_1', 'output'), so the values of a component can
+        be fetched without building key strings.  One index can be shared by
+        any number of conversions of the same document.
+
+        Args:
+            grg_data (dict): a grg data document, it is not modified
+        '''
+        self.mappings = {}
+        self.statuses = {}
+        for mapping_id, mapping in grg_data.get('mappings', {}).items():
+            self.mappings[mapping_id], self.statuses[mapping_id] = _index_mapping(mapping)
+
+    def mapping_ids(self):
+        '''Returns: the ids of the indexed mappings'''
+        return list(self.mappings.keys())
+
+    def merge(self, mapping_ids=None):
+        '''Overlays the given mappings, without copying or modifying them.
+        When several mappings assign a key, later mappings take precedence
+        and dictionary values are combined key by key.
+
+        Args:
+            mapping_ids (list, optional): the mappings to overlay, in
+                increasing priority, defaults to all of them.  Items may also
+                be mapping dictionaries that are not part of the document
+                (e.g. {'switch_1/status': 'off'})
+        Returns:
+            MappingOverlay: a read only mapping of component ids to their
+                attribute values
+        '''
+        return MappingOverlay([components for components, statuses in self._layers(mapping_ids)])
+
+    def status_assignment(self, mapping_ids=None):
+        '''Returns: a read only mapping of component ids to status values,
+        from the overlay of the given mappings'''
+        return ChainMap(*[statuses for components, statuses in reversed(self._layers(mapping_ids))])
+
+    def _layers(self, mapping_ids):
+        if mapping_ids is None:
+            mapping_ids = self.mappings.keys()
+
+        layers = []
+        for mapping_id in mapping_ids:
+            if isinstance(mapping_id, dict):
+                layers.append(_index_mapping(mapping_id))
+            else:
+                layers.append((self.mappings[mapping_id], self.statuses[mapping_id]))
+        return layers
+
+
+def _index_mapping(mapping):
+    '''Returns: the attribute values of each component and the status of each
+    component assigned by a grg data mapping'''
+    components = {}
+    for key, value in mapping.items():
+        component_id, _, attribute = key.partition('/')
+        if component_id not in components:
+            components[component_id] = {}
+        components[component_id][attribute] = value
+
+    statuses = {component_id: attributes['status']
+        for component_id, attributes in components.items() if 'status' in attributes}
+
+    return components, statuses
+
+
+class NestedChainMap(ChainMap):
+    '''A ChainMap where a key whose values are dictionaries in several of the
+    maps resolves to a NestedChainMap of those values, rather than only the
+    first one.  It is intended as a read only view.'''
+
+    def __getitem__(self, key):
+        values = [mapping[key] for mapping in self.maps if key in mapping]
+        if len(values) == 0:
+            return self.__missing__(key)
+        if len(values) > 1 and isinstance(values[0], dict):
+            nested = [value for value in values if isinstance(value, dict)]
+            if len(nested) > 1:
+                return NestedChainMap(*nested)
+        return values[0]
+
+
+class MappingOverlay(Mapping):
+    def __init__(self, layers):
+        '''A read only view of a sequence of indexed mappings, the values of
+        a component are resolved across the layers only when the component
+        is accessed.
+
+        Args:
+            layers (list): dictionaries of component ids to attribute
+                dictionaries, in increasing priority
+        '''
+        self.layers = layers
+
+    def __getitem__(self, component_id):
+        attributes = [layer[component_id] for layer in reversed(self.layers) if component_id in layer]
+        if len(attributes) == 0:
+            raise KeyError(component_id)
+        if len(attributes) == 1:
+            return attributes[0]
+        return NestedChainMap(*attributes)
+
+    def __contains__(self, component_id):
+        return any(component_id in layer for layer in self.layers)
+
+    def __iter__(self):
+        seen = set()
+        for layer in self.layers:
+            for component_id in layer:
+                if component_id not in seen:
+                    seen.add(component_id)
+                    yield component_id
+
+    def __len__(self):
+        return sum(1 for _ in self)
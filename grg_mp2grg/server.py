@@ -0,0 +1,186 @@
+'''a resident conversion server, which keeps the converter and its
+dependencies loaded between requests, for tools that convert many small
+cases'''
+
+from __future__ import print_function
+
+import io
+import json
+import socketserver
+import threading
+
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
+from urllib.parse import parse_qs
+from urllib.parse import urlsplit
+
+import grg_mp2grg.io
+import grg_mp2grg.common
+
+from grg_mpdata.exception import MPDataParsingError
+from grg_mpdata.exception import MPDataValidationError
+
+from grg_mp2grg.io import print_err
+
+
+class ConversionServer(socketserver.ThreadingMixIn, HTTPServer):
+    '''A local http server converting documents sent in request bodies.
+    Each request is handled in its own thread.
+
+        GET  /health    returns {"status": "ok", "version": ...}
+        POST /to_grg    converts a matpower case to a grg json document,
+                        options: omit_subtypes, skip_validation
+        POST /to_mp     converts a grg json document to a matpower case,
+                        options: mapping (repeated, in order),
+                        add_gen_costs, add_bus_names
+
+    Options are given as query parameters (e.g. /to_grg?skip_validation=1).
+    Malformed documents are answered with 400, documents that fail grg
+    validation with 422, and any other failure with 500, all with a json
+    body {"error": message}.
+    '''
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0), verbose=False):
+        '''
+        Args:
+            address (tuple): the host and port to listen on, port 0 picks a
+                free port, see server_address
+            verbose (bool): log each request on standard error
+        '''
+        HTTPServer.__init__(self, address, ConversionRequestHandler)
+        self.verbose = verbose
+        # grg_grgdata and jsonschema are deferred by the converter modules,
+        # the server loads them now so that the first request is not slower
+        grg_mp2grg.common.load_lazy_modules()
+
+    def start(self):
+        '''serves requests in a background thread, stopped by shutdown
+
+        Returns:
+            threading.Thread: the serving thread
+        '''
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def url(self):
+        '''Returns: the base url of this server'''
+        host, port = self.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'grg_mp2grg/' + __import__('grg_mp2grg').__version__
+
+    def do_GET(self):
+        path, options = self._route()
+        if path == '/health':
+            self._send_json(200, {'status': 'ok', 'version': __import__('grg_mp2grg').__version__})
+        else:
+            self._send_json(404, {'error': 'unknown path {}'.format(path)})
+
+    def do_POST(self):
+        path, options = self._route()
+        converters = {'/to_grg': _to_grg, '/to_mp': _to_mp}
+        if path not in converters:
+            self._send_json(404, {'error': 'unknown path {}'.format(path)})
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length).decode('utf-8')
+
+        try:
+            content_type, document = converters[path](body, options)
+        except (MPDataParsingError, ValueError, KeyError, TypeError) as error:
+            self._send_json(400, {'error': '{}: {}'.format(type(error).__name__, error)})
+        except MPDataValidationError as error:
+            self._send_json(422, {'error': str(error)})
+        except Exception as error:
+            self._send_json(500, {'error': '{}: {}'.format(type(error).__name__, error)})
+        else:
+            self._send(200, content_type, document)
+
+    def _route(self):
+        url = urlsplit(self.path)
+        return url.path, parse_qs(url.query)
+
+    def _send_json(self, status, data):
+        self._send(status, 'application/json', json.dumps(data))
+
+    def _send(self, status, content_type, document):
+        payload = document.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type+'; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+def _flag(options, name):
+    return options.get(name, ['0'])[-1].lower() in ('1', 'true', 'yes')
+
+
+def _to_grg(body, options):
+    case = grg_mp2grg.io.parse_mp_case_lines(io.StringIO(body))
+    grg_data = case.to_grg(_flag(options, 'omit_subtypes'), _flag(options, 'skip_validation'))
+    if grg_data is None:
+        raise MPDataValidationError('the grg data of the given case is not valid')
+
+    output = io.StringIO()
+    grg_mp2grg.io.write_grg_json(grg_data, output)
+    return 'application/json', output.getvalue()
+
+
+def _to_mp(body, options):
+    # only the requested mappings are decoded
+    grg_data = grg_mp2grg.io.parse_grg_text(body, mapping_ids=options.get('mapping'))
+    case = grg_mp2grg.io.build_mp_case(grg_data, options.get('mapping'),
+        add_gen_costs=_flag(options, 'add_gen_costs'), add_bus_names=_flag(options, 'add_bus_names'))
+    return 'text/plain', case.to_matpower()
+
+
+def main(args):
+    '''runs a conversion server until it is interrupted
+
+    Args:
+        args: an argparse data structure
+    '''
+    server = ConversionServer((args.host, args.port), args.verbose)
+    print_err('serving grg_mp2grg conversions at {}'.format(server.url()))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def build_cli_parser():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='''grg_mp2grg.%(prog)s is a resident http server for
+            converting power network datasets between the matpower and grg
+            formats, without paying the startup cost of each conversion''',
+
+        epilog='''Please file bugs at...''',
+    )
+    parser.add_argument('--host', help='the address to listen on', default='127.0.0.1')
+    parser.add_argument('--port', help='the port to listen on', type=int, default=8642)
+    parser.add_argument('--verbose', help='logs each request on standard error', default=False, action='store_true')
+
+    version = __import__('grg_mp2grg').__version__
+    parser.add_argument('-v', '--version', action='version', \
+        version='grg_mp2grg.%(prog)s (version '+version+')')
+
+    return parser
+
+
+if __name__ == '__main__':
+    parser = build_cli_parser()
+    main(parser.parse_args())
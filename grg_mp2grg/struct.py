@@ -2,58 +2,124 @@
 support grg data encoding'''
 
 from grg_mp2grg.exception import MP2GRGWarning
+from grg_mp2grg.common import DisjointSet
+from grg_mp2grg.common import LazyModule
+from grg_mp2grg.fingerprint import combine_fingerprints
+from grg_mp2grg.fingerprint import table_fingerprint
+from grg_mp2grg.fingerprint import value_fingerprint
+from grg_mp2grg.timings import no_timings
 
 import grg_mpdata.struct
-from grg_mpdata.struct import _guard_none
+from grg_mpdata.exception import MPDataParsingError
 
-from grg_grgdata.cmd import validate_grg
-import grg_grgdata.common as grg_common
+grg_cmd = LazyModule('grg_grgdata.cmd')
+grg_common = LazyModule('grg_grgdata.common')
 
 import json, math, warnings
 
-# TODO data format strings below should come from grg-grgdata project 
-class Case(grg_mpdata.struct.Case):
-
-    def to_grg(self, omit_subtype=False, skip_validation=False):
-        '''Returns: an encoding of this data structure as a grg data dictionary'''
-        #start = time.time()
-
-        data = {}
+from array import array
+from collections import OrderedDict
 
-        data['grg_version'] = grg_common.grg_version
-        data['units'] = grg_common.grg_units
+def _collect_grg(data, items):
+    '''inserts (path, value) pairs, as produced by the Case.iter_grg methods,
+    into a nested grg data dictionary
 
-        network = {}
-        data['network'] = network
+    Returns: the updated data dictionary
+    '''
+    for path, value in items:
+        container = data
+        for key in path[:-1]:
+            if key not in container:
+                container[key] = {}
+            container = container[key]
+        assert(path[-1] not in container)
+        container[path[-1]] = value
+    return data
 
-        network['type'] = 'network'
-        network['subtype'] = 'bus_breaker'
-        network['id'] = self.name
-        network['per_unit'] = True
-        network['description'] = 'Translated from Matpower data v2 by grg-mp2grg.  No model description is available in this format.'
 
-        base_mva = self.baseMVA
-        network['base_mva'] = base_mva
+# TODO data format strings below should come from grg-grgdata project 
+class Case(grg_mpdata.struct.Case):
 
-        comp_lookup = self._grg_component_lookup()
+    @property
+    def bus_table(self):
+        '''Returns: the buses of this case as a ComponentTable'''
+        return self._table('bus')
+
+    @property
+    def gen_table(self):
+        '''Returns: the generators of this case as a ComponentTable'''
+        return self._table('gen')
+
+    @property
+    def branch_table(self):
+        '''Returns: the branches of this case as a ComponentTable'''
+        return self._table('branch')
+
+    @property
+    def gencost_table(self):
+        '''Returns: the generator costs of this case as a ComponentTable'''
+        return self._table('gencost')
+
+    @property
+    def dcline_table(self):
+        '''Returns: the dc lines of this case as a ComponentTable'''
+        return self._table('dcline')
+
+    def _table(self, field):
+        rows = getattr(self, field)
+        if rows is None or isinstance(rows, ComponentTable):
+            return rows
+        return ComponentTable.from_rows(field, rows)
+
+    def fingerprints(self):
+        '''Returns: a fingerprint of each part of this case by name, the
+        header (name, version and baseMVA), each component table that is
+        present, and the bus names and dc line costs when present.  Cases
+        stored in lists and in ComponentTables have the same fingerprints.
+        '''
+        fingerprints = OrderedDict()
+        fingerprints['header'] = value_fingerprint([self.name, self.version, self.baseMVA])
+        for field in ('bus', 'gen', 'branch', 'gencost', 'dcline'):
+            table = self._table(field)
+            if table is not None:
+                fingerprints[field] = table_fingerprint(table)
+        for field in ('dclinecost', 'busname'):
+            rows = getattr(self, field)
+            if rows is not None:
+                fingerprints[field] = value_fingerprint([row.to_matpower() for row in rows])
+        return fingerprints
+
+    def fingerprint(self):
+        '''Returns: a fingerprint of this whole case, see fingerprints'''
+        return combine_fingerprints(self.fingerprints())
+
+    def to_grg(self, omit_subtype=False, skip_validation=False, timings=None):
+        '''Returns: an encoding of this data structure as a grg data dictionary
+
+        Args:
+            timings (Timings, optional): records the cost of each encoding
+                phase and of the grg validation
+        '''
+        if timings is None:
+            timings = no_timings
 
-        network_components, groups, switch_status = self._grg_components(comp_lookup, base_mva, omit_subtype)
-        network['components'] = network_components
-        data['groups'] = groups
-        data['mappings'] = self._grg_mappings(comp_lookup, switch_status, base_mva)
-        data['market'] = self._grg_market(comp_lookup, base_mva)
-        data['operation_constraints'] = self._grg_operations(comp_lookup)
+        data = {
+            'network': {'components': {}},
+            'groups': {},
+            'mappings': {'starting_points': {}, 'breakers_assignment': {}},
+            'market': {'operational_costs': {}},
+            'operation_constraints': {}
+        }
+        _collect_grg(data, self.iter_grg(omit_subtype, timings))
 
 
         if skip_validation:
             return data
 
-        #print(time.time() - start)
-        #start = time.time()
-        #print('start validation')
-        if validate_grg(data):
-            #print('VALID ****')
-            #print(time.time() - start)
+        with timings.phase('validation'):
+            valid = grg_cmd.validate_grg(data)
+
+        if valid:
             return data
         else:
             print('incorrect grg data representation.')
@@ -63,6 +129,44 @@ class Case(grg_mpdata.struct.Case):
             print('')
         return None
 
+    def iter_grg(self, omit_subtype=False, timings=None):
+        '''Yields: (path, value) pairs for every item of the grg encoding of
+        this data structure, where path is a tuple of keys locating value in
+        the grg data dictionary.  Empty sections produce no items.  When
+        timings are given, the time spent consuming each section is recorded
+        as a phase.'''
+        if timings is None:
+            timings = no_timings
+
+        yield ('grg_version',), grg_common.grg_version
+        yield ('units',), grg_common.grg_units
+
+        yield ('network', 'type'), 'network'
+        yield ('network', 'subtype'), 'bus_breaker'
+        yield ('network', 'id'), self.name
+        yield ('network', 'per_unit'), True
+        yield ('network', 'description'), 'Translated from Matpower data v2 by grg-mp2grg.  No model description is available in this format.'
+
+        base_mva = self.baseMVA
+        yield ('network', 'base_mva'), base_mva
+
+        with timings.phase('component lookup'):
+            comp_lookup = self._grg_component_lookup()
+
+        switch_status = {}
+        with timings.phase('components'):
+            for item in self.iter_grg_components(comp_lookup, base_mva, omit_subtype, switch_status):
+                yield item
+        with timings.phase('mappings'):
+            for item in self.iter_grg_mappings(comp_lookup, switch_status, base_mva):
+                yield item
+        with timings.phase('market'):
+            for item in self.iter_grg_market(comp_lookup, base_mva):
+                yield item
+        with timings.phase('operations'):
+            for item in self.iter_grg_operations(comp_lookup):
+                yield item
+
     def _grg_component_lookup(self):
         lookup = {
             'bus':{},
@@ -149,6 +253,35 @@ class Case(grg_mpdata.struct.Case):
     def _grg_components(self, lookup, base_mva, omit_subtype=False):
         components = {}
         groups = {}
+        switch_status = {}
+
+        sections = {'network': {'components': components}, 'groups': groups}
+        items = self.iter_grg_components(lookup, base_mva, omit_subtype, switch_status)
+        _collect_grg(sections, items)
+
+        return components, groups, switch_status
+
+
+    def iter_grg_components(self, lookup, base_mva, omit_subtype=False, switch_status=None):
+        '''Yields: (path, data) pairs for each grg network component and group.
+        Lines and dc lines are produced as soon as they are built, and groups
+        once all buses are placed.  The voltage levels of all buses, with
+        their loads and shunts, are built first, as the switches are numbered
+        in matpower component order.  A substation is produced, and released,
+        as soon as the last generator, dc line, line or transformer attached
+        to it is placed, so the number of voltage levels held at once depends
+        on the order of the matpower components.
+
+        Args:
+            lookup (dict): the grg component lookup, updated with voltage
+                level and substation ids
+            switch_status (dict, optional): filled with the status of each
+                breaker as it is created
+        '''
+        if switch_status is None:
+            switch_status = {}
+
+        groups = {}
 
         for mp_id, grg_id in lookup['area'].items():
             assert(not grg_id in groups)
@@ -172,7 +305,6 @@ class Case(grg_mpdata.struct.Case):
 
         switch_count = 1
         switch_zeros = grg_common.calc_zeros(3*len(self.bus)+len(self.gen)+2*len(self.branch))
-        switch_status = {}
 
         lookup['voltage_level'] = {}
         voltage_levels = {}
@@ -200,6 +332,79 @@ class Case(grg_mpdata.struct.Case):
                 voltage_levels[grg_vl_id]['voltage']['nominal_value'] = 1.0
                 voltage_levels[grg_vl_id]['voltage']['mp_base_kv'] = 0.0
 
+        # cluster buses into substations based on transformers
+        sub_buses = self.substation_clusters().sets()
+
+        lookup['substation'] = {}
+        substations = OrderedDict()
+        for index, buses in enumerate(sub_buses):
+            grg_ss_id = grg_common.substation_name_template % str(index+1).zfill(zeros)
+            #print(grg_ss_id, buses)
+            substations[grg_ss_id] = {
+                'id': grg_ss_id,
+                'type': 'substation',
+                'substation_components':{}
+            }
+
+            for bus_id in buses:
+                lookup['substation'][bus_id] = grg_ss_id
+                grg_vl_id = lookup['voltage_level'][bus_id]
+                substations[grg_ss_id]['substation_components'][grg_vl_id] = voltage_levels[grg_vl_id]
+
+            # initial code to merge voltage levels
+            # need resolution on voltage bounds beforehand
+
+            # vl_by_base_kv = {}
+            # for vl_id, vl_data in voltage_levels.items():
+            #     base_kv = vl_data['base_kv']
+            #     if not base_kv in vl_by_base_kv:
+            #         vl_by_base_kv[base_kv] = []
+            #     vl_by_base_kv[base_kv].append( (vl_id,vl_data) )
+
+            # voltage_levels_merged = []
+            # for base_kv, voltage_level_list in vl_by_base_kv.items():
+            #     if len(voltage_level_list) == 1:
+            #         voltage_levels_merged.append(voltage_level_list[0])
+            #     else:
+
+            #         voltage_level = {
+            #             'id': grg_vl_id,
+            #             'type': 'voltage_level',
+            #             'voltage':{
+            #                 'lower_limit': bus.vmin,
+            #                 'upper_limit': bus.vmax,
+            #                 'nominal_value': 1.0
+            #             },
+            #             'voltage_points':[],
+            #             'voltage_level_components':{},
+            #             'base_kv':bus.base_kv
+            #         }
+
+            # print(len(voltage_levels), vl_by_base_kv.keys())
+
+        # the number of components still to be attached to each substation
+        pending = dict((grg_ss_id, 0) for grg_ss_id in substations)
+        for gen in self.gen:
+            pending[lookup['substation'][gen.gen_bus]] += 1
+        for branch in (self.dcline or []):
+            pending[lookup['substation'][branch.f_bus]] += 1
+            pending[lookup['substation'][branch.t_bus]] += 1
+        for branch in self.branch:
+            pending[lookup['substation'][branch.f_bus]] += 1
+            if not branch.is_transformer():
+                pending[lookup['substation'][branch.t_bus]] += 1
+
+        def placed(grg_ss_id, count=1):
+            '''Returns: the items of the substation, once its last component
+            is placed'''
+            pending[grg_ss_id] -= count
+            if pending[grg_ss_id] > 0:
+                return []
+            substation = substations.pop(grg_ss_id)
+            for grg_id in substation['substation_components']:
+                voltage_levels.pop(grg_id, None)
+            return [(('network', 'components', grg_ss_id), substation)]
+
 
         for bus in self.bus:
             bus_data = bus.to_grg_bus(lookup)
@@ -237,6 +442,12 @@ class Case(grg_mpdata.struct.Case):
                 vl_components[grg_shunt_id] = shunt_data
                 vl_components[switch['id']] = switch
 
+        for grg_id, group in groups.items():
+            yield ('groups', grg_id), group
+
+        for grg_ss_id in [grg_ss_id for grg_ss_id, count in pending.items() if count == 0]:
+            for item in placed(grg_ss_id, 0):
+                yield item
 
         for gen in self.gen:
             gen_data = gen.to_grg_generator(lookup, base_mva, omit_subtype)
@@ -252,6 +463,9 @@ class Case(grg_mpdata.struct.Case):
             vl_components[grg_gen_id] = gen_data
             vl_components[switch['id']] = switch
 
+            for item in placed(lookup['substation'][gen.gen_bus]):
+                yield item
+
 
         if self.dcline is not None:
             for dcline in self.dcline:
@@ -266,13 +480,17 @@ class Case(grg_mpdata.struct.Case):
                 switch_status[switch_2['id']] = self._combine_status(dcline, mp_bus_lookup[dcline.t_bus])
                 switch_count += 2
 
-                components[grg_dcline_id] = dcline_data
+                yield ('network', 'components', grg_dcline_id), dcline_data
                 voltage_levels[grg_vl_id_1]['voltage_points'].append(switch_voltage_id_1)
                 voltage_levels[grg_vl_id_1]['voltage_level_components'][switch_1['id']] = switch_1
 
                 voltage_levels[grg_vl_id_2]['voltage_points'].append(switch_voltage_id_2)
                 voltage_levels[grg_vl_id_2]['voltage_level_components'][switch_2['id']] = switch_2
 
+                for bus_id in [dcline.f_bus, dcline.t_bus]:
+                    for item in placed(lookup['substation'][bus_id]):
+                        yield item
+
 
         transformers = {}
         for branch in self.branch:
@@ -288,83 +506,20 @@ class Case(grg_mpdata.struct.Case):
                 switch_status[switch_2['id']] = self._combine_status(branch, mp_bus_lookup[branch.t_bus])
                 switch_count += 2
 
-                components[grg_branch_id] = branch_data
+                yield ('network', 'components', grg_branch_id), branch_data
                 voltage_levels[grg_vl_id_1]['voltage_points'].append(switch_voltage_id_1)
                 voltage_levels[grg_vl_id_1]['voltage_level_components'][switch_1['id']] = switch_1
 
                 voltage_levels[grg_vl_id_2]['voltage_points'].append(switch_voltage_id_2)
                 voltage_levels[grg_vl_id_2]['voltage_level_components'][switch_2['id']] = switch_2
 
+                for bus_id in [branch.f_bus, branch.t_bus]:
+                    for item in placed(lookup['substation'][bus_id]):
+                        yield item
+
             else:
                 transformers[grg_branch_id] = (branch, branch_data)
 
-        # cluster buses into substations based on transformers
-        bus_sub = {}
-        for bus in self.bus:
-            bus_id = bus.bus_i
-            bus_sub[bus_id] = set([bus_id])
-
-        for grg_id, (mp_data, grg_data) in transformers.items():
-            bus_id_set = bus_sub[mp_data.f_bus] | bus_sub[mp_data.t_bus]
-
-            for bus_id in bus_id_set:
-                bus_sub[bus_id] = bus_id_set
-
-        sub_buses = {frozenset(buses) for buses in bus_sub.values()}
-
-        lookup['substation'] = {}
-        substations = {}
-        sub_voltage_levels = {}
-        zeros = grg_common.calc_zeros(len(self.bus))
-        for index, buses in enumerate(sorted(sub_buses, key=lambda x: min(x))):
-            grg_ss_id = grg_common.substation_name_template % str(index+1).zfill(zeros)
-            #print(grg_ss_id, buses)
-            components[grg_ss_id] = {
-                'id': grg_ss_id,
-                'type': 'substation',
-                'substation_components':{}
-            }
-
-            sub_voltage_levels[grg_ss_id] = {}
-            for bus_id in buses:
-                lookup['substation'][bus_id] = grg_ss_id
-                grg_vl_id = lookup['voltage_level'][bus_id]
-                sub_voltage_levels[grg_ss_id][grg_vl_id] = voltage_levels[grg_vl_id]
-
-        for grg_ss_id, s_voltage_levels in sub_voltage_levels.items():
-            components[grg_ss_id]['substation_components'].update(s_voltage_levels)
-
-            # initial code to merge voltage levels
-            # need resolution on voltage bounds beforehand
-
-            # vl_by_base_kv = {}
-            # for vl_id, vl_data in voltage_levels.items():
-            #     base_kv = vl_data['base_kv']
-            #     if not base_kv in vl_by_base_kv:
-            #         vl_by_base_kv[base_kv] = []
-            #     vl_by_base_kv[base_kv].append( (vl_id,vl_data) )
-
-            # voltage_levels_merged = []
-            # for base_kv, voltage_level_list in vl_by_base_kv.items():
-            #     if len(voltage_level_list) == 1:
-            #         voltage_levels_merged.append(voltage_level_list[0])
-            #     else:
-
-            #         voltage_level = {
-            #             'id': grg_vl_id,
-            #             'type': 'voltage_level',
-            #             'voltage':{
-            #                 'lower_limit': bus.vmin,
-            #                 'upper_limit': bus.vmax,
-            #                 'nominal_value': 1.0
-            #             },
-            #             'voltage_points':[],
-            #             'voltage_level_components':{},
-            #             'base_kv':bus.base_kv
-            #         }
-
-            # print(len(voltage_levels), vl_by_base_kv.keys())
-
         for grg_id, (mp_data, grg_data) in transformers.items():
             #continue ###
             f_grg_ss_id = lookup['substation'][mp_data.f_bus]
@@ -380,64 +535,74 @@ class Case(grg_mpdata.struct.Case):
             switch_status[switch_2['id']] = self._combine_status(mp_data, mp_bus_lookup[mp_data.t_bus])
             switch_count += 2
 
-            components[f_grg_ss_id]['substation_components'][grg_id] = grg_data
+            substations[f_grg_ss_id]['substation_components'][grg_id] = grg_data
             voltage_levels[grg_vl_id_1]['voltage_points'].append(switch_voltage_id_1)
             voltage_levels[grg_vl_id_1]['voltage_level_components'][switch_1['id']] = switch_1
 
             voltage_levels[grg_vl_id_2]['voltage_points'].append(switch_voltage_id_2)
             voltage_levels[grg_vl_id_2]['voltage_level_components'][switch_2['id']] = switch_2
 
-        return components, groups, switch_status
+            for item in placed(f_grg_ss_id):
+                yield item
+
+        assert(len(substations) == 0) # a component was not counted
+
+
+    def substation_clusters(self):
+        '''Returns: a DisjointSet of bus ids, where buses connected by a
+        transformer are in the same set (i.e. substation)'''
+        clusters = DisjointSet(bus.bus_i for bus in self.bus)
+        for branch in self.branch:
+            if branch.is_transformer():
+                clusters.union(branch.f_bus, branch.t_bus)
+        return clusters
 
 
     def _grg_mappings(self, lookup, switch_status, base_mva):
-        mappings = {}
+        mappings = {'starting_points': {}, 'breakers_assignment': {}}
+        _collect_grg({'mappings': mappings}, self.iter_grg_mappings(lookup, switch_status, base_mva))
+        return mappings
 
-        starting_points = {}
-        mappings['starting_points'] = starting_points
 
+    def iter_grg_mappings(self, lookup, switch_status, base_mva):
+        '''Yields: (path, value) pairs for each grg starting point and breaker
+        assignment'''
         for bus in self.bus:
             key, data = bus.get_grg_bus_setpoint(lookup)
-            assert(key not in starting_points)
-            starting_points[key] = data
+            yield ('mappings', 'starting_points', key), data
 
             if bus.has_load():
                 key, data = bus.get_grg_load_setpoint(lookup, base_mva)
-                assert(key not in starting_points)
-                starting_points[key] = data
+                yield ('mappings', 'starting_points', key), data
 
         for gen in self.gen:
             key, data = gen.get_grg_setpoint(lookup, base_mva)
-            assert(key not in starting_points)
-            starting_points[key] = data
+            yield ('mappings', 'starting_points', key), data
 
         for branch in self.branch:
             if branch.is_transformer():
                 key, data = branch.get_grg_tap_changer_setpoint(lookup)
-                assert(key not in starting_points)
-                starting_points[key] = data
+                yield ('mappings', 'starting_points', key), data
 
         if self.dcline != None:
             for dcline in self.dcline:
                 kvs = dcline.get_grg_setpoint(lookup, base_mva)
                 for key, data in kvs.items():
-                    assert(key not in starting_points)
-                    starting_points[key] = data
-
+                    yield ('mappings', 'starting_points', key), data
 
-        breaker_assignment = {}
-        mappings['breakers_assignment'] = breaker_assignment
         for switch_id, status_value in switch_status.items():
             switch_pointer = '{}/status'.format(switch_id)
-            breaker_assignment[switch_pointer] = status_value
-
-        return mappings
+            yield ('mappings', 'breakers_assignment', switch_pointer), status_value
 
 
     def _grg_market(self, lookup, base_mva):
-        market = {}
-        costs = {}
-        market['operational_costs'] = costs
+        market = {'operational_costs': {}}
+        _collect_grg({'market': market}, self.iter_grg_market(lookup, base_mva))
+        return market
+
+
+    def iter_grg_market(self, lookup, base_mva):
+        '''Yields: (path, value) pairs for each grg operational cost model'''
         if self.gencost is not None:
             for gencost in self.gencost:
                 gen_count = len(self.gen)
@@ -446,24 +611,24 @@ class Case(grg_mpdata.struct.Case):
                 active_cost_function = gencost.index < len(self.gen)
 
                 key, value = gencost.get_grg_cost_model(lookup, gen_id, gen_count, base_mva)
-                assert(key not in costs)
 
                 if not gen.is_synchronous_condenser() or not active_cost_function:
-                    costs[key] = value
+                    yield ('market', 'operational_costs', key), value
                 else:
                     pass #TODO check that all costs are 0 
-        return market
 
 
     def _grg_operations(self, lookup):
         operations = {}
+        _collect_grg({'operation_constraints': operations}, self.iter_grg_operations(lookup))
+        return operations
 
+
+    def iter_grg_operations(self, lookup):
+        '''Yields: (path, value) pairs for each grg operation constraint'''
         for branch in self.branch:
             key, data = branch.get_grg_operations(lookup)
-            assert(key not in operations)
-            operations[key] = data
-
-        return operations
+            yield ('operation_constraints', key), data
 
 
     def _combine_status(self, *mp_comps):
@@ -532,7 +697,8 @@ class Case(grg_mpdata.struct.Case):
         return switch_1, grg_switch_voltage_id_1, switch_2, grg_switch_voltage_id_2
 
 
-class Bus(grg_mpdata.struct.Bus):
+class _BusMixin(object):
+    __slots__ = ()
 
     def has_load(self):
         return not(self.pd == 0 and self.qd == 0)
@@ -635,7 +801,9 @@ class Bus(grg_mpdata.struct.Bus):
         return key, value
 
 
-class Generator(grg_mpdata.struct.Generator):
+class _GeneratorMixin(object):
+    __slots__ = ()
+
     def is_synchronous_condenser(self):
         # NOTE self.pg == 0 is needed for bad data cases, where pg is out of bounds. in time, may be able to remove this.
         return self.pmin == 0 and self.pmax == 0 and self.pg == 0
@@ -697,7 +865,9 @@ class Generator(grg_mpdata.struct.Generator):
 
 
 
-class GeneratorCost(grg_mpdata.struct.GeneratorCost):
+class _GeneratorCostMixin(object):
+    __slots__ = ()
+
     def get_grg_cost_model(self, lookup, gen_id, gen_count, base_mva):
         '''Returns: a grg data encoding of this data structure as a dictionary'''
 
@@ -736,7 +906,9 @@ class GeneratorCost(grg_mpdata.struct.GeneratorCost):
 
 
 
-class Branch(grg_mpdata.struct.Branch):
+class _BranchMixin(object):
+    __slots__ = ()
+
     def is_transformer(self):
         return not (self.tap == 0 and self.shift == 0)
 
@@ -873,7 +1045,9 @@ class Branch(grg_mpdata.struct.Branch):
 
 
 
-class DCLine(grg_mpdata.struct.DCLine):
+class _DCLineMixin(object):
+    __slots__ = ()
+
     def to_grg_dcline(self, lookup, base_mva, omit_subtype=False):
         '''Returns: a grg data dc line name and data as a dictionary'''
 
@@ -959,3 +1133,271 @@ class DCLine(grg_mpdata.struct.DCLine):
 
         return data
 
+
+
+class Bus(_BusMixin, grg_mpdata.struct.Bus):
+    pass
+
+class Generator(_GeneratorMixin, grg_mpdata.struct.Generator):
+    pass
+
+class GeneratorCost(_GeneratorCostMixin, grg_mpdata.struct.GeneratorCost):
+    pass
+
+class Branch(_BranchMixin, grg_mpdata.struct.Branch):
+    pass
+
+class DCLine(_DCLineMixin, grg_mpdata.struct.DCLine):
+    pass
+
+
+def _build_bus(index, data):
+    return Bus(*data)
+
+def _build_generator(index, data):
+    return Generator(index, *data)
+
+def _build_branch(index, data):
+    return Branch(index, *data)
+
+def _build_dcline(index, data):
+    return DCLine(index, *data)
+
+def _build_gencost(index, data):
+    return GeneratorCost(index, *data[:4], cost=data[4:])
+
+
+# column layouts of the matpower data matrices as (name, typecode) pairs,
+# integer valued columns are stored as 'q' and all others as 'd'
+_table_columns = {
+    'bus': [
+        ('bus_i', 'q'), ('bus_type', 'q'), ('pd', 'd'), ('qd', 'd'),
+        ('gs', 'd'), ('bs', 'd'), ('area', 'q'), ('vm', 'd'), ('va', 'd'),
+        ('base_kv', 'd'), ('zone', 'q'), ('vmax', 'd'), ('vmin', 'd'),
+        ('lam_p', 'd'), ('lam_q', 'd'), ('mu_vmax', 'd'), ('mu_vmin', 'd')
+    ],
+    'gen': [
+        ('gen_bus', 'q'), ('pg', 'd'), ('qg', 'd'), ('qmax', 'd'),
+        ('qmin', 'd'), ('vg', 'd'), ('mbase', 'd'), ('gen_status', 'q'),
+        ('pmax', 'd'), ('pmin', 'd'), ('pc1', 'd'), ('pc2', 'd'),
+        ('qc1min', 'd'), ('qc1max', 'd'), ('qc2min', 'd'), ('qc2max', 'd'),
+        ('ramp_agc', 'd'), ('ramp_10', 'd'), ('ramp_30', 'd'),
+        ('ramp_q', 'd'), ('apf', 'd'), ('mu_pmax', 'd'), ('mu_pmin', 'd'),
+        ('mu_qmax', 'd'), ('mu_qmin', 'd')
+    ],
+    'branch': [
+        ('f_bus', 'q'), ('t_bus', 'q'), ('br_r', 'd'), ('br_x', 'd'),
+        ('br_b', 'd'), ('rate_a', 'd'), ('rate_b', 'd'), ('rate_c', 'd'),
+        ('tap', 'd'), ('shift', 'd'), ('br_status', 'q'), ('angmin', 'd'),
+        ('angmax', 'd'), ('pf', 'd'), ('qf', 'd'), ('pt', 'd'), ('qt', 'd'),
+        ('mu_sf', 'd'), ('mu_st', 'd'), ('mu_angmin', 'd'),
+        ('mu_angmax', 'd')
+    ],
+    'dcline': [
+        ('f_bus', 'q'), ('t_bus', 'q'), ('br_status', 'q'), ('pf', 'd'),
+        ('pt', 'd'), ('qf', 'd'), ('qt', 'd'), ('vf', 'd'), ('vt', 'd'),
+        ('pmin', 'd'), ('pmax', 'd'), ('qminf', 'd'), ('qmaxf', 'd'),
+        ('qmint', 'd'), ('qmaxt', 'd'), ('loss0', 'd'), ('loss1', 'd'),
+        ('mu_pmin', 'd'), ('mu_pmax', 'd'), ('mu_qminf', 'd'),
+        ('mu_qmaxf', 'd'), ('mu_qmint', 'd'), ('mu_qmaxt', 'd')
+    ],
+    'gencost': [
+        ('model', 'q'), ('startup', 'd'), ('shutdown', 'd'), ('ncost', 'q')
+    ],
+}
+
+_row_builders = {
+    'bus': _build_bus,
+    'gen': _build_generator,
+    'branch': _build_branch,
+    'dcline': _build_dcline,
+    'gencost': _build_gencost,
+}
+
+
+def _compact_slots(field, *extra):
+    return tuple(name for name, typecode in _table_columns[field]) + extra
+
+def _compact_eq(self, other):
+    if isinstance(other, self.__class__):
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+    return NotImplemented
+
+def _compact_ne(self, other):
+    if isinstance(other, self.__class__):
+        return not self.__eq__(other)
+    return NotImplemented
+
+
+# the compact classes share the grg conversion methods and the
+# grg_mpdata constructors, validation and matpower encoding of the
+# classes above, but store their attributes in __slots__ rather than a per
+# instance __dict__, which substantially reduces the memory of large cases
+
+class CompactBus(_BusMixin):
+    __slots__ = _compact_slots('bus', 'extended')
+    __init__ = grg_mpdata.struct.Bus.__init__
+    __str__ = grg_mpdata.struct.Bus.__str__
+    __eq__ = _compact_eq
+    __ne__ = _compact_ne
+    validate = grg_mpdata.struct.Bus.validate
+    to_matpower = grg_mpdata.struct.Bus.to_matpower
+
+class CompactGenerator(_GeneratorMixin):
+    __slots__ = _compact_slots('gen', 'index', 'extended')
+    __init__ = grg_mpdata.struct.Generator.__init__
+    __str__ = grg_mpdata.struct.Generator.__str__
+    __eq__ = _compact_eq
+    __ne__ = _compact_ne
+    validate = grg_mpdata.struct.Generator.validate
+    to_matpower = grg_mpdata.struct.Generator.to_matpower
+
+class CompactGeneratorCost(_GeneratorCostMixin):
+    __slots__ = _compact_slots('gencost', 'index', 'cost')
+    __init__ = grg_mpdata.struct.GeneratorCost.__init__
+    __str__ = grg_mpdata.struct.GeneratorCost.__str__
+    __eq__ = _compact_eq
+    __ne__ = _compact_ne
+    validate = grg_mpdata.struct.GeneratorCost.validate
+    to_matpower = grg_mpdata.struct.GeneratorCost.to_matpower
+
+class CompactBranch(_BranchMixin):
+    __slots__ = _compact_slots('branch', 'index', 'extended', 'duals')
+    __init__ = grg_mpdata.struct.Branch.__init__
+    __str__ = grg_mpdata.struct.Branch.__str__
+    __eq__ = _compact_eq
+    __ne__ = _compact_ne
+    validate = grg_mpdata.struct.Branch.validate
+    to_matpower = grg_mpdata.struct.Branch.to_matpower
+
+class CompactDCLine(_DCLineMixin):
+    __slots__ = _compact_slots('dcline', 'index', 'extended')
+    __init__ = grg_mpdata.struct.DCLine.__init__
+    __str__ = grg_mpdata.struct.DCLine.__str__
+    __eq__ = _compact_eq
+    __ne__ = _compact_ne
+    validate = grg_mpdata.struct.DCLine.validate
+    to_matpower = grg_mpdata.struct.DCLine.to_matpower
+
+
+def _build_compact_bus(index, data):
+    return CompactBus(*data)
+
+def _build_compact_generator(index, data):
+    return CompactGenerator(index, *data)
+
+def _build_compact_branch(index, data):
+    return CompactBranch(index, *data)
+
+def _build_compact_dcline(index, data):
+    return CompactDCLine(index, *data)
+
+def _build_compact_gencost(index, data):
+    return CompactGeneratorCost(index, *data[:4], cost=data[4:])
+
+_compact_row_builders = {
+    'bus': _build_compact_bus,
+    'gen': _build_compact_generator,
+    'branch': _build_compact_branch,
+    'dcline': _build_compact_dcline,
+    'gencost': _build_compact_gencost,
+}
+
+_typecode_converters = {'q': int, 'd': float}
+
+
+def table_columns(field, width):
+    '''Returns: the (name, typecode) column layout of a matpower data matrix
+    with the given number of columns'''
+    columns = _table_columns[field]
+    if field == 'gencost':
+        return columns + [('cost_%d' % i, 'd') for i in range(1, width-len(columns)+1)]
+    if width > len(columns):
+        raise MPDataParsingError('matpower %s data has %d columns but at most %d '
+            'are supported' % (field, width, len(columns)))
+    return columns[:width]
+
+
+class ComponentTable(object):
+    def __init__(self, field, builder=None):
+        '''A column oriented encoding of a matpower data matrix.  Each column
+        is stored in a typed array (e.g. table['vmax']) and component objects
+        are only built when a row is accessed.  Rows are rebuilt on every
+        access, so modifications to them are not stored in the table.
+
+        Args:
+            field (str): the case field encoded by this table, one of 'bus',
+                'gen', 'branch', 'dcline' or 'gencost'
+            builder: a function mapping a row index and list of row values
+                to a component object, defaults to the grg_mp2grg classes
+        '''
+        self.field = field
+        self.builder = builder if builder is not None else _row_builders[field]
+        self.columns = OrderedDict()
+        self._converters = []
+        self._length = 0
+
+    @classmethod
+    def from_rows(cls, field, rows, builder=None):
+        '''Returns: a ComponentTable encoding the given component objects'''
+        table = cls(field, builder)
+        names = [name for name, typecode in _table_columns[field]]
+        for row in rows:
+            values = [getattr(row, name) for name in names]
+            if field == 'gencost':
+                values += row.cost
+            while len(values) > 0 and values[-1] is None:
+                values.pop()
+            table.append(values)
+        return table
+
+    def append(self, values):
+        '''adds a row of values, given as numbers or strings, to the table'''
+        if self._length == 0 and len(self.columns) == 0:
+            for name, typecode in table_columns(self.field, len(values)):
+                self.columns[name] = array(typecode)
+                self._converters.append(_typecode_converters[typecode])
+
+        if len(values) != len(self.columns):
+            raise MPDataParsingError('matlab matrix parsing error, '
+                'inconsistent number of items in each row.  Expected %d '
+                'given %d.' % (len(self.columns), len(values)))
+
+        for column, converter, value in zip(self.columns.values(), self._converters, values):
+            column.append(converter(value))
+        self._length += 1
+
+    def row(self, index):
+        '''Returns: a component object built from the given row'''
+        if index < 0:
+            index += self._length
+        if index < 0 or index >= self._length:
+            raise IndexError('%s table index out of range' % self.field)
+        return self.builder(index, [column[index] for column in self.columns.values()])
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield self.row(index)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.columns[key]
+        if isinstance(key, slice):
+            return [self.row(index) for index in range(*key.indices(self._length))]
+        return self.row(key)
+
+    def __eq__(self, other):
+        if isinstance(other, ComponentTable):
+            return self.field == other.field and self.columns == other.columns
+        if isinstance(other, list):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
@@ -0,0 +1,168 @@
+'''synthetic matpower cases of any size, built by tiling an existing case,
+for measuring how the conversions scale'''
+
+from __future__ import print_function
+
+import copy
+
+from grg_mp2grg.struct import Case
+
+
+def tile_case(case, copies, ties=1):
+    '''Builds a case of several copies of a given case, where consecutive
+    copies are connected by tie branches.  The buses of copy k are numbered
+    bus_i + k*n, where n is the largest bus number of the given case, and
+    the generators, generator costs, branches and dc lines of each copy are
+    appended in copy order and reindexed.  Only the first copy keeps its
+    reference buses, the reference buses of the other copies become PV
+    buses.
+
+    Args:
+        case (Case): the case to tile, with components stored in lists, and
+            bus names, if any, in the order of the buses
+        copies (int): the number of copies of the case
+        ties (int): the number of tie branches between consecutive copies,
+            each is a copy of the first in service line of the case, between
+            the same bus of both copies
+    Returns:
+        Case: the tiled case, which shares no component objects with case
+    '''
+    if copies < 1:
+        raise ValueError('at least one copy is required, given {}'.format(copies))
+
+    offset = max(bus.bus_i for bus in case.bus)
+    gen_buses = set(gen.gen_bus for gen in case.gen)
+
+    buses = []
+    for k in range(copies):
+        for bus in case.bus:
+            bus = _shifted(bus, k*offset, 'bus_i')
+            if k > 0 and bus.bus_type == 3:
+                bus.bus_type = 2 if bus.bus_i - k*offset in gen_buses else 1
+            buses.append(bus)
+
+    gens = _tile(case.gen, copies, offset, 'gen_bus')
+    branches = _tile(case.branch, copies, offset, 'f_bus', 't_bus')
+    branches.extend(_tie_branches(case, copies, ties, offset))
+
+    gencosts = None
+    if case.gencost is not None:
+        # a second block of costs, one per generator, is for reactive power
+        blocks = [case.gencost[i:i+len(case.gen)] for i in range(0, len(case.gencost), len(case.gen))]
+        gencosts = [row for block in blocks for row in _tile(block, copies, offset)]
+
+    dclines = None
+    if case.dcline is not None:
+        dclines = _tile(case.dcline, copies, offset, 'f_bus', 't_bus')
+
+    dclinecosts = None
+    if case.dclinecost is not None:
+        dclinecosts = _tile(case.dclinecost, copies, offset)
+
+    busnames = None
+    if case.busname is not None:
+        # the bus names are in bus order, and are indexed by bus number as in
+        # build_mp_case
+        busnames = []
+        for k in range(copies):
+            for bus, busname in zip(buses[k*len(case.bus):(k+1)*len(case.bus)], case.busname):
+                busname = copy.copy(busname)
+                busname.index = bus.bus_i
+                busname.name = '{}_{}'.format(busname.name, k+1) if k > 0 else busname.name
+                busnames.append(busname)
+
+    for rows in (gens, branches, gencosts, dclines, dclinecosts):
+        if rows is not None:
+            for index, row in enumerate(rows):
+                row.index = index
+
+    name = '{}_x{}'.format(case.name, copies)
+    return Case(name, case.version, case.baseMVA, buses, gens, branches, gencosts, dclines, dclinecosts, busnames)
+
+
+def _shifted(row, shift, *bus_fields):
+    '''Returns: a copy of a component row, with its bus fields shifted'''
+    row = copy.copy(row)
+    for field in bus_fields:
+        setattr(row, field, getattr(row, field) + shift)
+    return row
+
+
+def _tile(rows, copies, offset, *bus_fields):
+    return [_shifted(row, k*offset, *bus_fields) for k in range(copies) for row in rows]
+
+
+def _tie_branches(case, copies, ties, offset):
+    '''Returns: the tie branches between consecutive copies of case, spread
+    evenly over the buses of the case'''
+    lines = [branch for branch in case.branch if branch.br_status == 1 and branch.tap == 0.0 and branch.shift == 0.0]
+    if len(lines) == 0 or ties < 1:
+        return []
+
+    tie_buses = [case.bus[(i*len(case.bus))//ties].bus_i for i in range(min(ties, len(case.bus)))]
+
+    branches = []
+    for k in range(copies-1):
+        for bus_i in tie_buses:
+            branch = copy.copy(lines[0])
+            branch.f_bus = bus_i + k*offset
+            branch.t_bus = bus_i + (k+1)*offset
+            branches.append(branch)
+    return branches
+
+
+def tile_case_to_size(case, buses, ties=1):
+    '''Returns: the smallest tiling of case (see tile_case) with at least the
+    given number of buses'''
+    copies = max(1, -(-buses // len(case.bus)))
+    return tile_case(case, copies, ties)
+
+
+def main(args):
+    '''writes a tiled matpower case, and optionally its grg encoding
+
+    Args:
+        args: an argparse data structure
+    '''
+    import grg_mp2grg.io
+
+    case = grg_mp2grg.io.parse_mp_case_file(args.file)
+    if args.buses is not None:
+        tiled = tile_case_to_size(case, args.buses, args.ties)
+    else:
+        tiled = tile_case(case, args.copies, args.ties)
+
+    with open(args.output, 'w') as output_file:
+        output_file.write(tiled.to_matpower())
+        output_file.write('\n')
+    print('wrote {} buses, {} branches and {} generators to {}'.format(len(tiled.bus), len(tiled.branch), len(tiled.gen), args.output))
+
+    if args.grg_output is not None:
+        with open(args.grg_output, 'w') as output_file:
+            grg_mp2grg.io.write_grg_json(tiled.to_grg(skip_validation=not args.validate), output_file)
+            output_file.write('\n')
+        print('wrote the grg encoding to {}'.format(args.grg_output))
+
+
+def build_cli_parser():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='''grg_mp2grg.%(prog)s builds large synthetic matpower
+            cases by tiling an existing case''',
+    )
+    parser.add_argument('file', help='the matpower case to tile (.m)')
+    parser.add_argument('output', help='the matpower file to write (.m)')
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument('--copies', help='the number of copies of the case', type=int, default=2)
+    size.add_argument('--buses', help='the minimum number of buses of the tiled case', type=int, default=None)
+    parser.add_argument('--ties', help='the number of tie branches between consecutive copies', type=int, default=1)
+    parser.add_argument('--grg-output', help='also writes the grg encoding of the tiled case to this file', default=None)
+    parser.add_argument('--validate', help='validates the grg encoding, this is slow for large cases', default=False, action='store_true')
+
+    return parser
+
+
+if __name__ == '__main__':
+    parser = build_cli_parser()
+    main(parser.parse_args())
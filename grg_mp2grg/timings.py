@@ -0,0 +1,125 @@
+'''instrumentation for recording the cost of each conversion phase'''
+
+import contextlib
+import time
+
+from grg_mp2grg.common import LazyModule
+
+# tracemalloc imports pickle, it is only needed when memory is traced
+tracemalloc = LazyModule('tracemalloc')
+
+
+class Timings(object):
+    def __init__(self, trace_memory=True):
+        '''Records the wall time, cpu time and peak memory allocations of named
+        phases.  Phases may be nested, a nested phase is reported under the
+        name of its parents joined with '/' (e.g. 'to_grg/mappings').
+
+        Before python 3.9, tracemalloc can not reset its peak, so a phase
+        only has a known peak when it raises the highest allocation level
+        seen since tracing started, its peak is None otherwise.
+
+        Args:
+            trace_memory (bool): record peak allocations with tracemalloc,
+                this slows the measured code down noticeably
+        '''
+        self.trace_memory = trace_memory
+        self.phases = []
+        self._stack = []
+        self._started_tracing = False
+
+    def start(self, name):
+        '''starts a phase, which runs until the matching call to stop'''
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            if len(self._stack) > 0 and hasattr(tracemalloc, 'reset_peak'):
+                self._flush_peak(self._stack[-1])
+            memory, peak_mark = tracemalloc.get_traced_memory()
+        else:
+            memory, peak_mark = 0, 0
+
+        self._stack.append({
+            'phase': '/'.join([entry['phase'] for entry in self._stack] + [name]),
+            'wall': time.perf_counter(),
+            'cpu': time.process_time(),
+            'memory': memory,
+            'peak': memory,
+            'peak_mark': peak_mark
+        })
+
+    def stop(self):
+        '''stops the most recently started phase and records it'''
+        wall = time.perf_counter()
+        cpu = time.process_time()
+
+        entry = self._stack.pop()
+        if self.trace_memory:
+            if hasattr(tracemalloc, 'reset_peak'):
+                self._flush_peak(entry)
+                if len(self._stack) > 0:
+                    self._stack[-1]['peak'] = max(self._stack[-1]['peak'], entry['peak'])
+            else:
+                # without reset_peak, the traced peak covers everything since
+                # tracing started, it is only this phase's peak if it rose
+                # during the phase
+                peak = tracemalloc.get_traced_memory()[1]
+                entry['peak'] = peak if peak > entry['peak_mark'] else None
+
+            if len(self._stack) == 0 and self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+        self.phases.append({
+            'phase': entry['phase'],
+            'wall': wall - entry['wall'],
+            'cpu': cpu - entry['cpu'],
+            'peak': entry['peak'] - entry['memory'] if self.trace_memory and entry['peak'] is not None else None
+        })
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        '''a context manager recording the enclosed code as a phase'''
+        self.start(name)
+        try:
+            yield self
+        finally:
+            self.stop()
+
+    def _flush_peak(self, entry):
+        entry['peak'] = max(entry['peak'], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+
+    def report(self):
+        '''Returns: a list of dictionaries, one per recorded phase in the order
+        the phases finished, with the keys 'phase', 'wall' (seconds), 'cpu'
+        (seconds) and 'peak' (bytes allocated above the phase's starting
+        point, None if memory is not traced or the peak is not known)
+        '''
+        return [dict(phase) for phase in self.phases]
+
+    def __str__(self):
+        lines = ['%-40s %10s %10s %12s' % ('phase', 'wall (s)', 'cpu (s)', 'peak (KiB)')]
+        for phase in self.phases:
+            if phase['peak'] is not None:
+                peak = '%.1f' % (phase['peak']/1024.0)
+            else:
+                peak = 'n/a' if self.trace_memory else '-'
+            lines.append('%-40s %10.4f %10.4f %12s' % (phase['phase'], phase['wall'], phase['cpu'], peak))
+        return '\n'.join(lines)
+
+
+class _NoTimings(object):
+    '''a stand in for Timings, used when no instrumentation is requested'''
+    def start(self, name):
+        pass
+
+    def stop(self):
+        pass
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        yield self
+
+no_timings = _NoTimings()
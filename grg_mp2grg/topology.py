@@ -0,0 +1,254 @@
+'''the network topology of grg data documents, with a cache for reusing it
+across conversions of the same network'''
+
+import warnings
+
+from collections import OrderedDict
+
+from grg_mp2grg.common import LazyModule
+from grg_mp2grg.fingerprint import combine_fingerprints
+from grg_mp2grg.fingerprint import value_fingerprint
+from grg_mp2grg.exception import MP2GRGWarning
+from grg_mp2grg.timings import no_timings
+
+grg_cmd = LazyModule('grg_grgdata.cmd')
+
+
+class Topology(object):
+    def __init__(self, grg_data, status_assignment, timings=None, network=None):
+        '''The result of the graph passes over a grg network that are needed to
+        build a matpower case, for a given assignment of component statuses,
+        together with the grouping of components by matpower bus and the
+        matpower index of each component.  It must not be modified, as it
+        may be shared between conversions.
+
+        Args:
+            grg_data (dict): a grg data document
+            status_assignment (dict): component ids to status values
+            timings (Timings, optional): records the cost of the graph passes
+            network (tuple, optional): the status independent parts of an
+                earlier Topology of the same network (see network()), which
+                skips those passes
+        '''
+        if timings is None:
+            timings = no_timings
+
+        if network is None:
+            with timings.phase('components by type'):
+                cbt = grg_cmd.components_by_type(grg_data)
+                network = (cbt, grg_cmd.voltage_level_by_voltage_point(grg_data), _index_lookups(grg_data, cbt))
+        self.components, self.voltage_levels, self.index_lookups = network
+
+        with timings.phase('voltage point collapse'):
+            self.bus_numbers = _number_buses(self.components, grg_cmd.collapse_voltage_points(grg_data, status_assignment))
+            self.active_voltage_points = grg_cmd.active_voltage_points(grg_data, status_assignment)
+            self.isolated_voltage_points = grg_cmd.isolated_voltage_points(grg_data, status_assignment)
+
+        with timings.phase('component grouping'):
+            self.buses_by_bid = self._group_by_bus('bus')
+            self.loads_by_bid = self._group_by_bus('load')
+            self.shunts_by_bid = self._group_by_bus('shunt')
+
+            self.bid_with_active_gen = set()
+            for gen in self.components['generator'] + self.components['synchronous_condenser']:
+                if gen['link'] in self.active_voltage_points:
+                    self.bid_with_active_gen.add(self.bus_numbers[gen['link']])
+
+    def _group_by_bus(self, component_type):
+        groups = {}
+        for comp in self.components[component_type]:
+            bid = self.bus_numbers[comp['link']]
+            if not bid in groups:
+                groups[bid] = []
+            groups[bid].append(comp)
+        return groups
+
+    def network(self):
+        '''Returns: the status independent parts of this topology'''
+        return self.components, self.voltage_levels, self.index_lookups
+
+
+def _number_buses(cbt, vp2int):
+    '''Returns: a matpower bus number for each voltage point, given the bus
+    index of each voltage point'''
+    if all('source_id' in bus for bus in cbt['bus']):
+        # TODO check for clashes with other voltage point ints
+        number_update = {}
+        for bus in cbt['bus']:
+            number_update[vp2int[bus['link']]] = int(bus['source_id'])
+            #vp2int[bus['link']] = int(bus['source_id'])
+
+        for k,v in vp2int.items():
+            if v in number_update:
+                vp2int[k] = number_update[v]
+    else:
+        # make 1 based, becouse required by matpower
+        for k,v in vp2int.items():
+            vp2int[k] = v+1
+
+    return vp2int
+
+
+def _index_lookups(grg_data, cbt):
+    '''Returns: the matpower index of each area, zone, branch, generator and
+    dc line component, by component id'''
+    groups = grg_data.get('groups', {})
+    return {
+        'area': _group_index_lookup(groups, 'area'),
+        'zone': _group_index_lookup(groups, 'zone'),
+        'branch': _component_index_lookup(cbt, ['ac_line', 'two_winding_transformer']),
+        'gen': _component_index_lookup(cbt, ['generator', 'synchronous_condenser']),
+        'dcline': _component_index_lookup(cbt, ['dc_line'])
+    }
+
+
+def _group_index_lookup(groups, group_type):
+    groups = [grp for grp in groups.values() if grp['type'] == group_type]
+
+    lookup = {}
+    use_source_ids = all('source_id' in grp for grp in groups)
+    for idx, grp in enumerate(groups, 1):
+        for comp_id in grp['component_ids']:
+            if not comp_id in lookup:
+                lookup[comp_id] = int(grp['source_id']) if use_source_ids else idx
+            else:
+                warnings.warn('component %s is in multiple %ss only %s will be used.' % (comp_id, group_type, lookup[comp_id]), MP2GRGWarning)
+    return lookup
+
+
+def _component_index_lookup(cbt, component_types):
+    lookup = {}
+    if all('source_id' in comp for comp_type in component_types for comp in cbt[comp_type]):
+        for comp_type in component_types:
+            for comp in cbt[comp_type]:
+                lookup[comp['id']] = int(comp['source_id'])
+    else:
+        offset = 0
+        for comp_type in component_types:
+            for i, comp in enumerate(sorted(cbt[comp_type], key=lambda x: x['id'])):
+                lookup[comp['id']] = i+offset
+            offset += len(cbt[comp_type])
+    return lookup
+
+
+def network_fingerprint(grg_data, fingerprints=None):
+    '''Returns: a hash of the network and groups sections of a grg data
+    document, which determine its topology
+
+    Args:
+        fingerprints (dict, optional): precomputed section fingerprints of
+            grg_data, see grg_mp2grg.fingerprint.grg_fingerprints
+    '''
+    if fingerprints is None:
+        fingerprints = {'network': value_fingerprint(grg_data['network'])}
+    groups = fingerprints.get('groups')
+    if groups is None:
+        groups = value_fingerprint(grg_data.get('groups', {}))
+    return combine_fingerprints({'network': fingerprints['network'], 'groups': groups})
+
+
+class TopologyCache(object):
+    def __init__(self, max_size=16):
+        '''A bounded cache of Topology objects, keyed by a network fingerprint
+        and a status assignment.  When the statuses change but the network
+        does not, the status independent passes are still reused.  The least
+        recently used entries are dropped beyond max_size.
+
+        Fingerprinting a network costs about as much as building its
+        topology, so the fingerprint of a document is remembered by the
+        identity of its network and groups sections.  A document that is
+        modified in place must be dropped with invalidate before it is used
+        again.
+
+        Args:
+            max_size (int): the maximum number of cached topologies, and of
+                cached networks
+        '''
+        self.max_size = max_size
+        self._topologies = OrderedDict()
+        self._networks = OrderedDict()
+        self._fingerprints = OrderedDict()
+
+    def get(self, grg_data, status_assignment, timings=None, fingerprint=None):
+        '''Returns: the Topology of grg_data under status_assignment, from the
+        cache if possible
+
+        Args:
+            fingerprint (str, optional): a precomputed network fingerprint,
+                see network_fingerprint
+        '''
+        if fingerprint is None:
+            fingerprint = self._network_fingerprint(grg_data)
+
+        key = (fingerprint, frozenset(status_assignment.items()))
+        if key in self._topologies:
+            self._topologies.move_to_end(key)
+            return self._topologies[key]
+
+        network = self._networks.get(fingerprint)
+        topology = Topology(grg_data, status_assignment, timings, network)
+
+        self._store(self._networks, fingerprint, topology.network())
+        self._store(self._topologies, key, topology)
+        return topology
+
+    def for_network(self, grg_data, fingerprint=None):
+        '''Returns: a view of this cache with the same get method, which only
+        fingerprints grg_data once.  The document must not be modified while
+        the view is in use.'''
+        if fingerprint is None:
+            fingerprint = self._network_fingerprint(grg_data)
+        return _NetworkTopologies(self, fingerprint)
+
+    def _network_fingerprint(self, grg_data):
+        '''Returns: the network fingerprint of grg_data, computed only when
+        its network and groups sections are not the objects of an earlier
+        call.  The entries hold on to these objects, so their ids are not
+        reused while they are cached.'''
+        network = grg_data['network']
+        groups = grg_data.get('groups')
+
+        entry = self._fingerprints.get(id(network))
+        if entry is not None and entry[0] is network and entry[1] is groups:
+            self._fingerprints.move_to_end(id(network))
+            return entry[2]
+
+        fingerprint = network_fingerprint(grg_data)
+        self._store(self._fingerprints, id(network), (network, groups, fingerprint))
+        return fingerprint
+
+    def _store(self, entries, key, value):
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > self.max_size:
+            entries.popitem(last=False)
+
+    def invalidate(self, fingerprint=None):
+        '''drops the cached topologies of the network with the given
+        fingerprint, or all cached topologies if it is not given'''
+        if fingerprint is None:
+            self._topologies.clear()
+            self._networks.clear()
+            self._fingerprints.clear()
+            return
+
+        for key in [key for key in self._topologies if key[0] == fingerprint]:
+            del self._topologies[key]
+        self._networks.pop(fingerprint, None)
+        for key in [key for key, entry in self._fingerprints.items() if entry[2] == fingerprint]:
+            del self._fingerprints[key]
+
+    def __len__(self):
+        return len(self._topologies)
+
+
+class _NetworkTopologies(object):
+    def __init__(self, cache, fingerprint):
+        self.cache = cache
+        self.fingerprint = fingerprint
+
+    def get(self, grg_data, status_assignment, timings=None, fingerprint=None):
+        return self.cache.get(grg_data, status_assignment, timings, self.fingerprint)
+
+    def for_network(self, grg_data, fingerprint=None):
+        return self.cache.for_network(grg_data, fingerprint)
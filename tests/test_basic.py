@@ -1,4 +1,4 @@
-import os, pytest
+import os, pytest, io, json
 
 import collections
 import warnings
@@ -32,6 +32,12 @@ class Test4Bus:
         grg_mp2grg.io.write_json_case_file(path, self.mp_case)
         os.remove(path)
 
+    def test_004(self):
+        grg_case = self.mp_case.to_grg()
+        output = io.StringIO()
+        grg_mp2grg.io.write_grg_json(grg_case, output)
+        assert output.getvalue() == json.dumps(grg_case, sort_keys=True, indent=2, separators=(',', ': '))
+
 
 class TestGRGVariants:
     def test_no_operations(self):
@@ -67,3 +73,49 @@ class TestGRGVariants:
         assert len(mp_case.gen) == 5
         assert len(mp_case.gencost) == 5
 
+
+class TestSubstations:
+    def test_disjoint_set(self):
+        clusters = grg_mp2grg.common.DisjointSet(range(1, 7))
+        clusters.union(1, 2)
+        clusters.union(5, 3)
+        clusters.union(2, 3)
+        assert clusters.find(5) == clusters.find(1)
+        assert clusters.find(4) == 4
+        assert clusters.sets() == [[1, 2, 3, 5], [4], [6]]
+        assert len(clusters) == 6
+
+    def test_transformer_chain(self):
+        mp_case = grg_mp2grg.io.parse_mp_case_file(os.path.dirname(os.path.realpath(__file__))+'/data/idempotent/pglib-opf/pglib_opf_case14_ieee.m')
+        clusters = mp_case.substation_clusters()
+        for branch in mp_case.branch:
+            if branch.is_transformer():
+                assert clusters.find(branch.f_bus) == clusters.find(branch.t_bus)
+
+        grg_case = mp_case.to_grg()
+        components = components_by_type(grg_case)
+        assert len(components['substation']) == len(clusters.sets())
+
+
+class TestIterators:
+    def setup_method(self, _):
+        self.mp_case = grg_mp2grg.io.parse_mp_case_file(os.path.dirname(os.path.realpath(__file__))+'/data/idempotent/pglib-opf/pglib_opf_case5_pjm.m')
+
+    def test_001(self):
+        grg_case = self.mp_case.to_grg()
+        for path, value in self.mp_case.iter_grg():
+            data = grg_case
+            for key in path:
+                data = data[key]
+            assert data == value
+
+    def test_002(self):
+        lookup = self.mp_case._grg_component_lookup()
+        switch_status = {}
+        paths = [path for path, value in self.mp_case.iter_grg_components(lookup, self.mp_case.baseMVA, switch_status=switch_status)]
+        assert len(paths) == len(set(paths))
+        assert all(path[0] in ['network', 'groups'] for path in paths)
+
+        mappings = list(self.mp_case.iter_grg_mappings(lookup, switch_status, self.mp_case.baseMVA))
+        breakers = [path for path, value in mappings if path[1] == 'breakers_assignment']
+        assert len(breakers) == len(switch_status)
@@ -0,0 +1,47 @@
+import os, shutil
+
+import grg_mp2grg
+
+data_dir = os.path.dirname(os.path.realpath(__file__))+'/data/idempotent'
+case5_file = data_dir+'/pglib-opf/pglib_opf_case5_pjm.m'
+
+
+class TestBatch:
+    def setup_method(self, _):
+        self.parser = grg_mp2grg.io.build_cli_parser()
+
+    def test_001(self):
+        case_files = grg_mp2grg.io.find_case_files([data_dir])
+        assert (case5_file, 'pglib-opf/pglib_opf_case5_pjm') in case_files
+        assert all(file_name.endswith('.m') for file_name, output_name in case_files)
+        assert grg_mp2grg.io.find_case_files([data_dir+'/case3_*.m']) == [(data_dir+'/case3_00{}.m'.format(i), 'case3_00{}'.format(i)) for i in range(3)]
+
+    def test_002(self, tmp_path):
+        output_dir = str(tmp_path / 'grg')
+        summaries = list(grg_mp2grg.io.convert_case_files([data_dir+'/pglib-opf'], output_dir))
+        assert len(summaries) == len(grg_mp2grg.io.find_case_files([data_dir+'/pglib-opf']))
+        assert all(summary['status'] == 'ok' and summary['size'] > 0 for summary in summaries)
+
+        grg_data = grg_mp2grg.io.parse_grg_case_file(output_dir+'/pglib_opf_case5_pjm.json')
+        assert grg_data == grg_mp2grg.io.parse_mp_case_file(case5_file).to_grg()
+
+        mp_dir = str(tmp_path / 'mp')
+        summaries = list(grg_mp2grg.io.convert_case_files([output_dir+'/*.json'], mp_dir, mappings=['starting_points', 'breakers_assignment']))
+        assert all(summary['status'] == 'ok' for summary in summaries)
+        assert grg_mp2grg.io.parse_mp_case_file(mp_dir+'/pglib_opf_case5_pjm.m') == grg_mp2grg.io.parse_mp_case_file(case5_file)
+
+    def test_003(self, tmp_path):
+        input_dir = tmp_path / 'input'
+        input_dir.mkdir()
+        shutil.copy(case5_file, str(input_dir))
+        (input_dir / 'broken.m').write_text('function mpc = broken\nmpc.bus = [\n')
+
+        summaries = list(grg_mp2grg.io.convert_case_files([str(input_dir)], str(tmp_path / 'output'), workers=2))
+        assert [summary['status'] for summary in summaries] == ['failed', 'ok']
+        assert summaries[0]['error'] is not None
+        assert 'converted 1 of 2 files' in grg_mp2grg.io.batch_summary(summaries)
+
+    def test_cli(self, tmp_path):
+        output_dir = str(tmp_path / 'output')
+        grg_mp2grg.io.main(self.parser.parse_args([data_dir+'/case3_*.m', '--output-dir', output_dir, '--workers', '2']))
+        assert sorted(os.listdir(output_dir)) == ['case3_000.json', 'case3_001.json', 'case3_002.json']
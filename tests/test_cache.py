@@ -0,0 +1,53 @@
+import os, pytest
+
+import grg_mp2grg
+from grg_mp2grg.cache import ParseCache
+
+data_dir = os.path.dirname(os.path.realpath(__file__))+'/data/idempotent/pglib-opf/'
+
+
+class TestParseCache:
+    def test_001(self, tmp_path):
+        cache = ParseCache(str(tmp_path))
+        case_1 = grg_mp2grg.io.parse_mp_case_file(data_dir+'pglib_opf_case5_pjm.m', cache=cache)
+        assert len(os.listdir(str(tmp_path))) == 1
+
+        case_2 = grg_mp2grg.io.parse_mp_case_file(data_dir+'pglib_opf_case5_pjm.m', cache=cache)
+        assert len(os.listdir(str(tmp_path))) == 1
+        assert case_1 == case_2
+
+        case_3 = grg_mp2grg.io.parse_mp_case_file(data_dir+'pglib_opf_case5_pjm.m', columnar=True, cache=cache)
+        assert len(os.listdir(str(tmp_path))) == 2
+        assert isinstance(case_3.bus, grg_mp2grg.struct.ComponentTable)
+
+    def test_002(self, tmp_path):
+        cache = ParseCache(str(tmp_path))
+        key_1 = cache.key(data_dir+'pglib_opf_case5_pjm.m')
+        key_2 = cache.key(data_dir+'pglib_opf_case14_ieee.m')
+        assert key_1 != key_2
+        assert cache.get(key_1) == None
+
+        version = grg_mp2grg.__version__
+        try:
+            grg_mp2grg.__version__ = version+'.dev'
+            assert cache.key(data_dir+'pglib_opf_case5_pjm.m') != key_1
+        finally:
+            grg_mp2grg.__version__ = version
+
+    def test_003(self, tmp_path):
+        cache = ParseCache(str(tmp_path), max_size=0)
+        grg_mp2grg.io.parse_mp_case_file(data_dir+'pglib_opf_case5_pjm.m', cache=cache)
+        assert len(os.listdir(str(tmp_path))) == 0
+
+    def test_004(self, tmp_path):
+        cache = ParseCache(str(tmp_path))
+        key = cache.key(data_dir+'pglib_opf_case5_pjm.m')
+        with open(os.path.join(str(tmp_path), key+'.pickle'), 'wb') as entry:
+            entry.write(b'not a pickle')
+        assert cache.get(key) == None
+        assert len(os.listdir(str(tmp_path))) == 0
+
+    def test_cli(self, tmp_path):
+        parser = grg_mp2grg.io.build_cli_parser()
+        grg_mp2grg.io.main(parser.parse_args([data_dir+'pglib_opf_case5_pjm.m', '--cache-dir', str(tmp_path)]))
+        assert len(os.listdir(str(tmp_path))) == 1
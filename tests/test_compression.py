@@ -0,0 +1,55 @@
+import os, bz2, gzip, lzma, shutil
+
+import grg_mp2grg
+
+case5_file = os.path.dirname(os.path.realpath(__file__))+'/data/idempotent/pglib-opf/pglib_opf_case5_pjm.m'
+mapping_ids = ['starting_points', 'breakers_assignment']
+codecs = {'.gz': gzip, '.bz2': bz2, '.xz': lzma}
+
+
+def compress(file_name, compressed_file_name):
+    module = codecs[os.path.splitext(compressed_file_name)[1]]
+    with open(file_name, 'rb') as source, module.open(compressed_file_name, 'wb') as target:
+        shutil.copyfileobj(source, target)
+
+
+class TestCompression:
+    def setup_method(self, _):
+        self.mp_case = grg_mp2grg.io.parse_mp_case_file(case5_file)
+        self.parser = grg_mp2grg.io.build_cli_parser()
+
+    def test_001(self, tmp_path):
+        for compression in codecs:
+            file_name = str(tmp_path / ('case5.m'+compression))
+            compress(case5_file, file_name)
+            assert grg_mp2grg.io.parse_mp_case_file(file_name) == self.mp_case
+
+    def test_002(self, tmp_path):
+        for compression, module in codecs.items():
+            file_name = str(tmp_path / ('case5.json'+compression))
+            grg_mp2grg.io.write_json_case_file(file_name, self.mp_case)
+            with module.open(file_name, 'rt') as grg_file:
+                assert grg_file.read(1) == '{'
+            assert grg_mp2grg.io.parse_grg_case_file(file_name) == self.mp_case.to_grg()
+
+    def test_003(self, tmp_path):
+        mp_file = str(tmp_path / 'case5.m.gz')
+        grg_file = str(tmp_path / 'case5.json.xz')
+        output_file = str(tmp_path / 'output.m.bz2')
+        compress(case5_file, mp_file)
+
+        grg_mp2grg.io.main(self.parser.parse_args([mp_file, '--output', grg_file]))
+        grg_mp2grg.io.main(self.parser.parse_args([grg_file, '--output', output_file, '-m'] + mapping_ids))
+        assert grg_mp2grg.io.parse_mp_case_file(output_file) == self.mp_case
+
+    def test_004(self, tmp_path):
+        input_dir = tmp_path / 'input'
+        input_dir.mkdir()
+        compress(case5_file, str(input_dir / 'case5.m.gz'))
+        shutil.copy(case5_file, str(input_dir / 'case5_copy.m'))
+
+        output_dir = str(tmp_path / 'output')
+        summaries = list(grg_mp2grg.io.convert_case_files([str(input_dir)], output_dir))
+        assert [summary['status'] for summary in summaries] == ['ok', 'ok']
+        assert sorted(os.listdir(output_dir)) == ['case5.json.gz', 'case5_copy.json']
+        assert grg_mp2grg.io.parse_grg_case_file(output_dir+'/case5.json.gz') == self.mp_case.to_grg()
@@ -0,0 +1,68 @@
+import os, copy, json, hashlib
+
+import grg_mp2grg
+from grg_mp2grg.fingerprint import changed_sections, grg_fingerprint, grg_fingerprints, value_fingerprint
+from grg_mp2grg.topology import network_fingerprint
+
+case5_file = os.path.dirname(os.path.realpath(__file__))+'/data/idempotent/pglib-opf/pglib_opf_case5_pjm.m'
+
+
+class TestCaseFingerprint:
+    def setup_method(self, _):
+        self.mp_case = grg_mp2grg.io.parse_mp_case_file(case5_file)
+
+    def test_001(self):
+        case = grg_mp2grg.io.parse_mp_case_file(case5_file)
+        assert(case.fingerprint() == self.mp_case.fingerprint())
+        assert(list(case.fingerprints()) == ['header', 'bus', 'gen', 'branch', 'gencost'])
+
+    def test_002(self):
+        case = grg_mp2grg.io.parse_mp_case_file(case5_file, columnar=True)
+        assert(case.fingerprints() == self.mp_case.fingerprints())
+
+    def test_003(self):
+        case = copy.deepcopy(self.mp_case)
+        case.branch[2].rate_a += 1.0
+        assert(case.fingerprint() != self.mp_case.fingerprint())
+        assert(changed_sections(case.fingerprints(), self.mp_case.fingerprints()) == ['branch'])
+
+        case = copy.deepcopy(self.mp_case)
+        case.baseMVA = 200.0
+        assert(changed_sections(case.fingerprints(), self.mp_case.fingerprints()) == ['header'])
+
+
+class TestGRGFingerprint:
+    def setup_method(self, _):
+        self.grg_data = grg_mp2grg.io.parse_mp_case_file(case5_file).to_grg()
+
+    def test_001(self):
+        shuffled = json.loads(json.dumps(self.grg_data, sort_keys=True))
+        assert(grg_fingerprint(shuffled) == grg_fingerprint(self.grg_data))
+
+        fingerprints = grg_fingerprints(self.grg_data)
+        assert('network' in fingerprints)
+        assert('mappings/starting_points' in fingerprints)
+        assert('mappings' not in fingerprints)
+
+    def test_002(self):
+        grg_data = copy.deepcopy(self.grg_data)
+        grg_data['mappings']['starting_points']['bus_1/voltage/magnitude'] = 1.01
+        assert(changed_sections(grg_fingerprints(grg_data), grg_fingerprints(self.grg_data)) == ['mappings/starting_points'])
+        assert(network_fingerprint(grg_data) == network_fingerprint(self.grg_data))
+
+        del grg_data['mappings']['breakers_assignment']
+        assert(changed_sections(grg_fingerprints(grg_data), grg_fingerprints(self.grg_data)) == ['mappings/breakers_assignment', 'mappings/starting_points'])
+
+    def test_003(self):
+        assert(network_fingerprint(self.grg_data, grg_fingerprints(self.grg_data)) == network_fingerprint(self.grg_data))
+
+    def test_004(self):
+        assert(value_fingerprint(1) != value_fingerprint(1.0))
+        assert(value_fingerprint([1, 2]) != value_fingerprint(['1', '2']))
+        assert(value_fingerprint({'a': 1, 'b': 2}) == value_fingerprint({'b': 2, 'a': 1}))
+
+    def test_005(self):
+        nested = {'a': list(range(200)), 'b': dict(('bus_%d' % i, [i, {'x': i/3.0}]) for i in range(150)), 'c': [list(range(70))]*3}
+        for value in [self.grg_data, [], {}, {'a': [{}, (1, 2.5, None, True)]}, -0.0, 'bus "1"\n', nested, [[]]*100]:
+            encoding = json.dumps(value, sort_keys=True, separators=(',', ':'))
+            assert(value_fingerprint(value) == hashlib.sha256(encoding.encode('utf-8')).hexdigest())
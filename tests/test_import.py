@@ -0,0 +1,74 @@
+import os, sys, ast, json, subprocess
+
+package_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+case5_file = os.path.dirname(os.path.realpath(__file__))+'/data/idempotent/pglib-opf/pglib_opf_case5_pjm.m'
+
+# dependencies that are only needed for some conversions, see common.LazyModule
+heavy_modules = ['grg_grgdata', 'jsonschema', 'multiprocessing', 'concurrent.futures', 'tempfile', 'pickle']
+
+# grg_mpdata imports these itself, so they are always loaded with it, but
+# the grg_mp2grg modules must not import them when they are loaded
+deferred_modules = heavy_modules + ['argparse', 'grg_mpdata.cmd']
+
+
+def imported_modules(code):
+    '''runs code in a fresh interpreter and returns the modules it imported,
+    and the seconds it took'''
+    script = '\n'.join([
+        'import sys, time, json',
+        'start = time.perf_counter()',
+        code,
+        'print(json.dumps([time.perf_counter() - start, sorted(sys.modules.keys())]))'
+    ])
+    environment = dict(os.environ)
+    environment['PYTHONPATH'] = os.pathsep.join([package_dir, environment.get('PYTHONPATH', '')])
+    output = subprocess.check_output([sys.executable, '-W', 'ignore', '-c', script], env=environment, stderr=subprocess.DEVNULL)
+    seconds, modules = json.loads(output.decode('utf-8').strip().splitlines()[-1])
+    return seconds, set(modules)
+
+
+class TestImport:
+    def test_001(self):
+        seconds, modules = imported_modules('import grg_mp2grg')
+        assert 'grg_mp2grg.io' not in modules
+        assert 'grg_mpdata' not in modules
+
+    def test_002(self):
+        seconds, modules = imported_modules('import grg_mp2grg\ngrg_mp2grg.io.parse_mp_case_file({!r})'.format(case5_file))
+        assert 'grg_mp2grg.io' in modules
+        assert all(module not in modules for module in heavy_modules)
+
+    def test_003(self):
+        seconds, modules = imported_modules('import grg_mp2grg\ngrg_mp2grg.io.parse_mp_case_file({!r}).to_grg()'.format(case5_file))
+        assert 'grg_grgdata' in modules
+        assert 'jsonschema' in modules
+
+    def test_004(self):
+        lazy_seconds = min(imported_modules('import grg_mp2grg.io')[0] for i in range(3))
+        eager_seconds = min(imported_modules('import grg_mp2grg.io, grg_grgdata')[0] for i in range(3))
+        print('import grg_mp2grg.io: {:.4f} s, with grg_grgdata: {:.4f} s'.format(lazy_seconds, eager_seconds))
+        assert lazy_seconds < eager_seconds
+
+    def test_005(self):
+        seconds, modules = imported_modules('import grg_mp2grg.server\ngrg_mp2grg.server.ConversionServer().server_close()')
+        assert 'grg_grgdata.cmd' in modules
+        assert 'grg_grgdata.common' in modules
+        assert 'jsonschema' in modules
+
+    def test_006(self):
+        source_dir = os.path.join(package_dir, 'grg_mp2grg')
+        for file_name in sorted(os.listdir(source_dir)):
+            if not file_name.endswith('.py'):
+                continue
+            with open(os.path.join(source_dir, file_name), 'r') as source_file:
+                tree = ast.parse(source_file.read())
+
+            for node in tree.body:
+                if isinstance(node, ast.Import):
+                    names = [alias.name for alias in node.names]
+                elif isinstance(node, ast.ImportFrom):
+                    names = [node.module]
+                else:
+                    continue
+                for name in names:
+                    assert not any(name == module or name.startswith(module+'.') for module in deferred_modules), (file_name, name)
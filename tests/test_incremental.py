@@ -0,0 +1,57 @@
+import os, copy
+
+import grg_mp2grg
+from grg_grgdata.cmd import components_by_type
+from grg_mp2grg.incremental import IncrementalMPCase
+
+case5_file = os.path.dirname(os.path.realpath(__file__))+'/data/idempotent/pglib-opf/pglib_opf_case5_pjm.m'
+mapping_ids = ['starting_points', 'breakers_assignment']
+
+
+def switch_ids(grg_data):
+    return sorted(switch['id'] for switch in components_by_type(grg_data)['switch'])
+
+
+class TestIncremental:
+    def setup_method(self, _):
+        self.mp_case = grg_mp2grg.io.parse_mp_case_file(case5_file)
+        self.grg_data = self.mp_case.to_grg()
+
+    def expected(self, status_changes):
+        overlay = {'{}/status'.format(comp_id): status for comp_id, status in status_changes.items()}
+        return grg_mp2grg.io.build_mp_case(self.grg_data, mapping_ids + [overlay])
+
+    def test_001(self):
+        incremental = IncrementalMPCase(self.grg_data, mapping_ids)
+        assert incremental.case == self.mp_case
+
+    def test_002(self):
+        base = IncrementalMPCase(self.grg_data, mapping_ids)
+        for switch_id in switch_ids(self.grg_data):
+            updated = base.with_statuses({switch_id: 'off'})
+            assert updated.case == self.expected({switch_id: 'off'})
+        assert base.case == self.mp_case
+
+    def test_003(self):
+        base = IncrementalMPCase(self.grg_data, mapping_ids)
+        changes = {switch_id: 'off' for switch_id in switch_ids(self.grg_data)[:6]}
+        updated = base
+        for switch_id in changes:
+            updated = updated.with_statuses({switch_id: 'off'})
+        assert updated.case == self.expected(changes)
+
+        for switch_id in changes:
+            updated = updated.with_statuses({switch_id: 'on'})
+        assert updated.case == self.mp_case
+
+    def test_004(self):
+        grg_data = copy.deepcopy(self.grg_data)
+        buses = sorted(components_by_type(grg_data)['bus'], key=lambda bus: bus['id'])
+        grg_data['network']['components']['switch_tie'] = {'id': 'switch_tie', 'type': 'switch', 'subtype': 'breaker',
+            'link_1': buses[0]['link'], 'link_2': buses[1]['link'], 'status': {'var': ['off', 'on']}}
+        grg_data['mappings']['breakers_assignment']['switch_tie/status'] = 'off'
+
+        base = IncrementalMPCase(grg_data, mapping_ids)
+        updated = base.with_statuses({'switch_tie': 'on'})
+        assert len(updated.case.bus) == len(base.case.bus) - 1
+        assert updated.case == grg_mp2grg.io.build_mp_case(grg_data, mapping_ids + [{'switch_tie/status': 'on'}])
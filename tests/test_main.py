@@ -22,3 +22,6 @@ class TestCLI:
     def test_005(self):
         with pytest.raises(IOError):
             grg_mp2grg.io.main(self.parser.parse_args(['bloop.json']))
+
+    def test_006(self):
+        grg_mp2grg.io.main(self.parser.parse_args([os.path.dirname(os.path.realpath(__file__))+'/data/idempotent/pglib-opf/pglib_opf_case5_pjm.m', '--timings', '--skip-validation']))
@@ -0,0 +1,60 @@
+import os, copy, pytest
+
+import grg_mp2grg
+from grg_mp2grg.mapping import MappingIndex
+
+case5_file = os.path.dirname(os.path.realpath(__file__))+'/data/idempotent/pglib-opf/pglib_opf_case5_pjm.m'
+
+
+class TestMappingIndex:
+    def setup_method(self, _):
+        self.mp_case = grg_mp2grg.io.parse_mp_case_file(case5_file)
+        self.grg_data = self.mp_case.to_grg()
+
+    def test_001(self):
+        index = MappingIndex(self.grg_data)
+        merged = index.merge()
+        for mapping in self.grg_data['mappings'].values():
+            for key, value in mapping.items():
+                component_id, attribute = key.split('/', 1)
+                assert merged[component_id][attribute] == value
+        assert len(merged) == len(set(key.split('/')[0] for mapping in self.grg_data['mappings'].values() for key in mapping))
+
+    def test_002(self):
+        index = MappingIndex(self.grg_data)
+        status = index.status_assignment(['breakers_assignment'])
+        assert len(status) == len(self.grg_data['mappings']['breakers_assignment'])
+        assert index.status_assignment(['starting_points']) == {}
+
+    def test_003(self):
+        grg_data = copy.deepcopy(self.grg_data)
+        grg_data['mappings']['update'] = {'bus_1/voltage': {'magnitude': 1.05}}
+        original = copy.deepcopy(grg_data)
+
+        index = MappingIndex(grg_data)
+        voltage = index.merge(['starting_points', 'update'])['bus_1']['voltage']
+        assert voltage == {'angle': 0.0, 'magnitude': 1.05}
+        assert index.merge(['update', 'starting_points'])['bus_1']['voltage']['magnitude'] == 1.0
+        assert grg_data == original
+
+    def test_005(self):
+        grg_data = copy.deepcopy(self.grg_data)
+        grg_data['mappings']['outage'] = {'switch_01/status': 'off'}
+        original = copy.deepcopy(grg_data)
+
+        index = MappingIndex(grg_data)
+        assert index.status_assignment(['breakers_assignment', 'outage'])['switch_01'] == 'off'
+        assert index.status_assignment(['outage', 'breakers_assignment'])['switch_01'] == 'on'
+        assert 'switch_01' in index.merge(['outage'])
+        assert 'bus_1' not in index.merge(['outage'])
+        grg_mp2grg.io.build_mp_case(grg_data, ['starting_points', 'breakers_assignment', 'outage'], mapping_index=index)
+        assert grg_data == original
+
+    def test_004(self):
+        index = MappingIndex(self.grg_data)
+        mapping_ids = ['starting_points', 'breakers_assignment']
+        case_1 = grg_mp2grg.io.build_mp_case(self.grg_data, mapping_ids, mapping_index=index)
+        case_2 = grg_mp2grg.io.build_mp_case(self.grg_data, mapping_ids, mapping_index=index)
+        assert case_1 == case_2
+        assert case_1 == grg_mp2grg.io.build_mp_case(self.grg_data, mapping_ids)
+        assert case_1 == self.mp_case
@@ -0,0 +1,143 @@
+import os, io, json, pytest
+
+import grg_mp2grg
+
+from grg_mpdata.exception import MPDataParsingError
+from grg_mpdata.exception import MPDataWarning
+
+case5_file = os.path.dirname(os.path.realpath(__file__))+'/data/idempotent/pglib-opf/pglib_opf_case5_pjm.m'
+
+
+class TestStreamingParser:
+    def test_file_and_lines(self):
+        case_1 = grg_mp2grg.io.parse_mp_case_file(case5_file)
+        with open(case5_file, 'r') as mp_file:
+            case_2 = grg_mp2grg.io.parse_mp_case_lines(mp_file.readlines())
+        assert case_1 == case_2
+
+    def test_generator_input(self):
+        with open(case5_file, 'r') as mp_file:
+            case = grg_mp2grg.io.parse_mp_case_lines(line for line in mp_file)
+        assert len(case.bus) == 5
+        assert len(case.gen) == 5
+        assert len(case.branch) == 6
+        assert len(case.gencost) == 5
+
+    def test_inconsistent_columns(self):
+        with open(case5_file, 'r') as mp_file:
+            lines = mp_file.readlines()
+        index = [i for i, line in enumerate(lines) if line.startswith('mpc.branch')][0]
+        lines[index+1] = lines[index+1].replace(';', ' 0.0;')
+        with pytest.raises(MPDataParsingError):
+            grg_mp2grg.io.parse_mp_case_lines(lines)
+
+    def test_unrecognized_matrix(self):
+        with open(case5_file, 'r') as mp_file:
+            lines = mp_file.readlines()
+        lines += ['mpc.extra = [\n', '  1 2 3;\n', '];\n']
+        with pytest.warns(MPDataWarning):
+            case = grg_mp2grg.io.parse_mp_case_lines(lines)
+        assert len(case.bus) == 5
+
+
+class TestColumnar:
+    def setup_method(self, _):
+        self.mp_case = grg_mp2grg.io.parse_mp_case_file(case5_file)
+        self.mp_case_table = grg_mp2grg.io.parse_mp_case_file(case5_file, columnar=True)
+
+    def test_001(self):
+        assert isinstance(self.mp_case_table.bus, grg_mp2grg.struct.ComponentTable)
+        assert self.mp_case_table == self.mp_case
+
+    def test_002(self):
+        assert list(self.mp_case_table.bus_table['vmax']) == [bus.vmax for bus in self.mp_case.bus]
+        assert list(self.mp_case_table.branch_table['f_bus']) == [branch.f_bus for branch in self.mp_case.branch]
+        assert self.mp_case.gen_table == self.mp_case_table.gen_table
+
+    def test_003(self):
+        gen = self.mp_case_table.gen[-1]
+        assert isinstance(gen, grg_mp2grg.struct.Generator)
+        assert gen == self.mp_case.gen[-1]
+        assert self.mp_case_table.gencost[1:3] == self.mp_case.gencost[1:3]
+
+    def test_004(self):
+        assert self.mp_case_table.to_grg() == self.mp_case.to_grg()
+
+
+class TestCompact:
+    def setup_method(self, _):
+        self.mp_case = grg_mp2grg.io.parse_mp_case_file(case5_file)
+        self.mp_case_compact = grg_mp2grg.io.parse_mp_case_file(case5_file, compact=True)
+
+    def test_001(self):
+        for field in ['bus', 'gen', 'branch', 'gencost']:
+            for row in getattr(self.mp_case_compact, field):
+                assert not hasattr(row, '__dict__')
+        assert isinstance(self.mp_case_compact.bus[0], grg_mp2grg.struct.CompactBus)
+
+    def test_002(self):
+        for field in ['bus', 'gen', 'branch', 'gencost']:
+            rows = getattr(self.mp_case, field)
+            compact_rows = getattr(self.mp_case_compact, field)
+            assert [str(row) for row in rows] == [str(row) for row in compact_rows]
+        assert self.mp_case_compact.to_matpower() == self.mp_case.to_matpower()
+
+    def test_003(self):
+        assert self.mp_case_compact.to_grg() == self.mp_case.to_grg()
+
+    def test_004(self):
+        mp_case_compact = grg_mp2grg.io.parse_mp_case_file(case5_file, compact=True)
+        assert mp_case_compact == self.mp_case_compact
+        mp_case_compact.branch[0].rate_a += 1.0
+        assert mp_case_compact != self.mp_case_compact
+
+
+class TestSelectiveRead:
+    def setup_method(self, _):
+        self.grg_data = grg_mp2grg.io.parse_mp_case_file(case5_file).to_grg()
+        self.grg_data['mappings']['unused'] = dict(self.grg_data['mappings']['starting_points'])
+
+    def write(self, tmp_path):
+        file_name = str(tmp_path / 'case5.json')
+        with open(file_name, 'w') as grg_file:
+            grg_mp2grg.io.write_grg_json(self.grg_data, grg_file)
+        return file_name
+
+    def test_001(self, tmp_path):
+        file_name = self.write(tmp_path)
+        assert grg_mp2grg.io.parse_grg_case_file(file_name) == self.grg_data
+        assert grg_mp2grg.io.parse_grg_case_file(file_name, sections=list(self.grg_data)) == self.grg_data
+
+    def test_002(self, tmp_path):
+        file_name = self.write(tmp_path)
+        grg_data = grg_mp2grg.io.parse_grg_case_file(file_name, sections=['network'])
+        assert(grg_data == {'network': self.grg_data['network']})
+
+    def test_003(self, tmp_path):
+        file_name = self.write(tmp_path)
+        mapping_ids = ['starting_points', 'breakers_assignment', {'gen_1/status': 'off'}]
+        grg_data = grg_mp2grg.io.parse_grg_case_file(file_name, mapping_ids=mapping_ids)
+        assert(set(grg_data['mappings']) == set(['starting_points', 'breakers_assignment']))
+        assert(grg_data['network'] == self.grg_data['network'])
+
+        case = grg_mp2grg.io.build_mp_case(grg_data, mapping_ids)
+        assert case == grg_mp2grg.io.build_mp_case(self.grg_data, mapping_ids)
+
+    def test_004(self):
+        text = '{"a" : {"b": "}\\"]{", "c": [1, {"d": "["}]}, "e": [ ], "f": {}, "g": -1.5e3, "mappings": {"m1": {"x": "}"}, "m2": {"x": null}}}'
+        assert grg_mp2grg.io.parse_grg_text(text) == json.loads(text)
+        grg_data = grg_mp2grg.io.parse_grg_text(text, sections=['e', 'f', 'g'], mapping_ids=['m2'])
+        assert(grg_data == {'e': [], 'f': {}, 'g': -1500.0, 'mappings': {'m2': {'x': None}}})
+
+    def test_005(self):
+        for text in ['[1, 2]', '{"a": [1}', '{"a": 1} 2', '{"a": 1']:
+            with pytest.raises(ValueError):
+                grg_mp2grg.io.parse_grg_text(text, sections=['b'])
+
+    def test_006(self):
+        text = json.dumps(self.grg_data, indent=2)
+        for chunk_size in [1, 7, 4096]:
+            grg_data = grg_mp2grg.io.parse_grg_stream(io.StringIO(text), ['network', 'groups'], ['starting_points'], chunk_size)
+            assert(set(grg_data) == set(['network', 'groups', 'mappings']))
+            assert(grg_data['network'] == self.grg_data['network'])
+            assert(grg_data['mappings'] == {'starting_points': self.grg_data['mappings']['starting_points']})
@@ -0,0 +1,70 @@
+import os, copy, json, pytest
+
+import grg_mp2grg
+from grg_mp2grg.topology import TopologyCache
+
+case5_file = os.path.dirname(os.path.realpath(__file__))+'/data/idempotent/pglib-opf/pglib_opf_case5_pjm.m'
+
+
+class TestScenarios:
+    def setup_method(self, _):
+        self.mp_case = grg_mp2grg.io.parse_mp_case_file(case5_file)
+        self.grg_data = self.mp_case.to_grg()
+        self.scenarios = [
+            ['starting_points', 'breakers_assignment'],
+            ['starting_points', 'breakers_assignment', {'bus_1/voltage': {'magnitude': 1.05}}],
+            ['breakers_assignment', 'starting_points'],
+        ]
+
+    def test_001(self):
+        original = copy.deepcopy(self.grg_data)
+        cache = TopologyCache()
+        cases = list(grg_mp2grg.io.build_mp_cases(self.grg_data, self.scenarios, topology_cache=cache))
+        assert [name for name, case in cases] == ['scenario_1', 'scenario_2', 'scenario_3']
+        assert len(cache) == 1
+        assert cases[0][1] == self.mp_case
+        assert cases[1][1].bus[0].vm == 1.05
+        assert cases[2][1] == self.mp_case
+        assert self.grg_data == original
+
+    def test_002(self):
+        for name, case in grg_mp2grg.io.build_mp_cases(self.grg_data, self.scenarios):
+            assert case == grg_mp2grg.io.build_mp_case(self.grg_data, self.scenarios[int(name.split('_')[1])-1])
+
+    def test_003(self, tmp_path):
+        scenarios = {'base': self.scenarios[0], 'high_voltage': self.scenarios[1]}
+        file_names = grg_mp2grg.io.write_mp_case_files(str(tmp_path), self.grg_data, scenarios)
+        assert sorted(os.listdir(str(tmp_path))) == ['base.m', 'high_voltage.m']
+        assert grg_mp2grg.io.parse_mp_case_file(file_names[0]) == self.mp_case
+
+    def test_cli(self, tmp_path):
+        grg_file = str(tmp_path / 'case5.json')
+        grg_mp2grg.io.write_json_case_file(grg_file, self.mp_case)
+        scenarios_file = str(tmp_path / 'scenarios.json')
+        with open(scenarios_file, 'w') as scenarios:
+            json.dump({'base': self.scenarios[0], 'reversed': self.scenarios[2]}, scenarios)
+
+        parser = grg_mp2grg.io.build_cli_parser()
+        output_dir = str(tmp_path / 'cases')
+        grg_mp2grg.io.main(parser.parse_args([grg_file, '--scenarios', scenarios_file, '--output-dir', output_dir]))
+        assert sorted(os.listdir(output_dir)) == ['base.m', 'reversed.m']
+
+
+class TestParallelScenarios:
+    def setup_method(self, _):
+        self.mp_case = grg_mp2grg.io.parse_mp_case_file(case5_file)
+        self.grg_data = self.mp_case.to_grg()
+        self.scenarios = [['starting_points', 'breakers_assignment', {'bus_1/voltage': {'magnitude': 1.0+i/100.0}}] for i in range(8)]
+
+    def test_001(self):
+        sequential = list(grg_mp2grg.io.build_mp_cases(self.grg_data, self.scenarios))
+        for workers in [2, 3]:
+            parallel = list(grg_mp2grg.io.build_mp_cases(self.grg_data, self.scenarios, workers=workers))
+            assert [name for name, case in parallel] == [name for name, case in sequential]
+            assert all(a == b for (_, a), (_, b) in zip(parallel, sequential))
+        assert parallel[3][1].bus[0].vm == 1.03
+
+    def test_002(self, tmp_path):
+        file_names = grg_mp2grg.io.write_mp_case_files(str(tmp_path), self.grg_data, self.scenarios, workers=2)
+        assert file_names == [os.path.join(str(tmp_path), 'scenario_{}.m'.format(i)) for i in range(1, 9)]
+        assert grg_mp2grg.io.parse_mp_case_file(file_names[5]).bus[0].vm == 1.05
@@ -0,0 +1,52 @@
+import os, json
+
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import grg_mp2grg
+from grg_mp2grg.server import ConversionServer
+
+case5_file = os.path.dirname(os.path.realpath(__file__))+'/data/idempotent/pglib-opf/pglib_opf_case5_pjm.m'
+
+
+class TestServer:
+    def setup_method(self, _):
+        self.server = ConversionServer()
+        self.server.start()
+        with open(case5_file, 'r') as mp_file:
+            self.mp_text = mp_file.read()
+
+    def teardown_method(self, _):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def post(self, path, body):
+        with urlopen(self.server.url()+path, body.encode('utf-8')) as response:
+            return response.read().decode('utf-8')
+
+    def test_001(self):
+        with urlopen(self.server.url()+'/health') as response:
+            assert json.loads(response.read().decode('utf-8'))['status'] == 'ok'
+
+    def test_002(self):
+        grg_data = json.loads(self.post('/to_grg', self.mp_text))
+        assert grg_data == grg_mp2grg.io.parse_mp_case_file(case5_file).to_grg()
+
+        mp_text = self.post('/to_mp?mapping=starting_points&mapping=breakers_assignment', json.dumps(grg_data))
+        case = grg_mp2grg.io.parse_mp_case_lines(mp_text.splitlines())
+        assert case == grg_mp2grg.io.parse_mp_case_file(case5_file)
+
+    def test_003(self):
+        try:
+            self.post('/to_mp', '{"network": ')
+            assert False
+        except HTTPError as error:
+            assert error.code == 400
+            assert 'error' in json.loads(error.read().decode('utf-8'))
+
+    def test_004(self):
+        try:
+            self.post('/unknown', '')
+            assert False
+        except HTTPError as error:
+            assert error.code == 404
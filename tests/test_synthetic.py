@@ -0,0 +1,45 @@
+import os, io
+
+import grg_mp2grg
+from grg_mp2grg.synthetic import tile_case, tile_case_to_size
+
+case5_file = os.path.dirname(os.path.realpath(__file__))+'/data/idempotent/pglib-opf/pglib_opf_case5_pjm.m'
+dcline_file = os.path.dirname(os.path.realpath(__file__))+'/data/idempotent/case5_001.m'
+
+
+class TestSynthetic:
+    def setup_method(self, _):
+        self.mp_case = grg_mp2grg.io.parse_mp_case_file(case5_file)
+
+    def test_001(self):
+        tiled = tile_case(self.mp_case, 3, ties=2)
+        tiled.validate()
+        assert len(tiled.bus) == 3*len(self.mp_case.bus)
+        assert len(tiled.branch) == 3*len(self.mp_case.branch) + 2*2
+        assert len(tiled.gencost) == 3*len(self.mp_case.gencost)
+        assert len(set(bus.bus_i for bus in tiled.bus)) == len(tiled.bus)
+        assert [bus.bus_type for bus in tiled.bus].count(3) == 1
+        assert [gen.index for gen in tiled.gen] == list(range(len(tiled.gen)))
+
+    def test_002(self):
+        original = str(self.mp_case)
+        tile_case(self.mp_case, 2)
+        assert str(self.mp_case) == original
+
+    def test_003(self):
+        for file_name in [case5_file, dcline_file]:
+            tiled = tile_case(grg_mp2grg.io.parse_mp_case_file(file_name), 3)
+            assert grg_mp2grg.io.parse_mp_case_lines(io.StringIO(tiled.to_matpower())) == tiled
+            grg_data = tiled.to_grg()
+            assert grg_data is not None
+            assert grg_mp2grg.io.build_mp_case(grg_data, ['starting_points', 'breakers_assignment']) == tiled
+
+    def test_004(self):
+        assert len(tile_case_to_size(self.mp_case, 12).bus) == 15
+        assert len(tile_case_to_size(self.mp_case, 15).bus) == 15
+
+    def test_005(self):
+        mp_case = grg_mp2grg.io.build_mp_case(self.mp_case.to_grg(), ['starting_points', 'breakers_assignment'], add_bus_names=True)
+        tiled = tile_case(mp_case, 3)
+        assert [busname.index for busname in tiled.busname] == [bus.bus_i for bus in tiled.bus]
+        assert tiled.busname[len(mp_case.bus)].name == mp_case.busname[0].name+'_2'
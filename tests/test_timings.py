@@ -0,0 +1,53 @@
+import os, pytest, tracemalloc
+
+import grg_mp2grg
+from grg_mp2grg.timings import Timings
+
+case5_file = os.path.dirname(os.path.realpath(__file__))+'/data/idempotent/pglib-opf/pglib_opf_case5_pjm.m'
+
+
+class TestTimings:
+    def test_001(self):
+        timings = Timings()
+        with timings.phase('outer'):
+            with timings.phase('inner'):
+                data = [0.0]*100000
+            del data
+        report = timings.report()
+        assert [phase['phase'] for phase in report] == ['outer/inner', 'outer']
+        assert report[0]['peak'] >= 800000
+        assert report[1]['peak'] >= report[0]['peak']
+        assert all(phase['wall'] >= 0 and phase['cpu'] >= 0 for phase in report)
+
+    def test_002(self):
+        timings = Timings(trace_memory=False)
+        with timings.phase('a'):
+            pass
+        assert timings.report()[0]['peak'] == None
+
+    def test_003(self):
+        timings = Timings()
+        case = grg_mp2grg.io.parse_mp_case_file(case5_file, timings=timings)
+        grg_data = case.to_grg(timings=timings)
+        grg_mp2grg.io.build_mp_case(grg_data, ['starting_points', 'breakers_assignment'], timings=timings)
+        phases = [phase['phase'] for phase in timings.report()]
+        assert phases == ['parse', 'validate', 'component lookup', 'components',
+            'mappings', 'market', 'operations', 'validation',
+            'components by type', 'voltage point collapse', 'component grouping',
+            'bus build', 'branch build', 'gen build']
+
+    def test_004(self, monkeypatch):
+        # python before 3.9 has no tracemalloc.reset_peak
+        monkeypatch.delattr(tracemalloc, 'reset_peak', raising=False)
+        timings = Timings()
+        with timings.phase('outer'):
+            with timings.phase('large'):
+                data = [0.0]*100000
+            del data
+            with timings.phase('small'):
+                data = [0.0]*10
+        report = dict((phase['phase'], phase['peak']) for phase in timings.report())
+        assert report['outer/large'] >= 800000
+        assert report['outer/small'] is None
+        assert report['outer'] >= report['outer/large']
+        assert 'n/a' in str(timings)
@@ -0,0 +1,92 @@
+import os, copy, pytest
+
+import grg_mp2grg
+from grg_mp2grg.mapping import MappingIndex
+from grg_mp2grg.topology import TopologyCache, network_fingerprint
+
+case5_file = os.path.dirname(os.path.realpath(__file__))+'/data/idempotent/pglib-opf/pglib_opf_case5_pjm.m'
+mapping_ids = ['starting_points', 'breakers_assignment']
+
+
+class TestTopologyCache:
+    def setup_method(self, _):
+        self.mp_case = grg_mp2grg.io.parse_mp_case_file(case5_file)
+        self.grg_data = self.mp_case.to_grg()
+
+    def test_001(self):
+        cache = TopologyCache()
+        case_1 = grg_mp2grg.io.build_mp_case(self.grg_data, mapping_ids, topology_cache=cache)
+        case_2 = grg_mp2grg.io.build_mp_case(self.grg_data, mapping_ids, topology_cache=cache)
+        assert len(cache) == 1
+        assert case_1 == case_2
+        assert case_1 == self.mp_case
+
+    def test_002(self):
+        cache = TopologyCache()
+        status = MappingIndex(self.grg_data).status_assignment(mapping_ids)
+        topology = cache.get(self.grg_data, status)
+        assert cache.get(self.grg_data, dict(status)) is topology
+
+        outage = dict(status)
+        outage['switch_01'] = 'off'
+        outage_topology = cache.get(self.grg_data, outage)
+        assert outage_topology is not topology
+        assert outage_topology.components is topology.components
+        assert len(cache) == 2
+
+        cache.invalidate(network_fingerprint(self.grg_data))
+        assert len(cache) == 0
+        assert cache.get(self.grg_data, status) is not topology
+
+    def test_003(self):
+        cache = TopologyCache(max_size=1)
+        status = MappingIndex(self.grg_data).status_assignment(mapping_ids)
+        grg_data = copy.deepcopy(self.grg_data)
+        grg_data['network']['id'] = 'other'
+        assert network_fingerprint(grg_data) != network_fingerprint(self.grg_data)
+
+        topology = cache.get(self.grg_data, status)
+        cache.get(grg_data, status)
+        assert len(cache) == 1
+        assert cache.get(self.grg_data, status) is not topology
+
+    def test_004(self):
+        cache = TopologyCache()
+        fingerprint = network_fingerprint(self.grg_data)
+        case = grg_mp2grg.io.build_mp_case(self.grg_data, mapping_ids, topology_cache=cache, fingerprint=fingerprint)
+        assert case == self.mp_case
+        grg_mp2grg.io.build_mp_case(self.grg_data, mapping_ids, topology_cache=cache.for_network(self.grg_data))
+        assert len(cache) == 1
+
+        cache.invalidate(fingerprint)
+        assert len(cache) == 0
+
+    def test_005(self, monkeypatch):
+        calls = {'fingerprint': 0, 'topology': 0}
+
+        def counted_fingerprint(grg_data, fingerprints=None):
+            calls['fingerprint'] += 1
+            return network_fingerprint(grg_data, fingerprints)
+
+        class CountedTopology(grg_mp2grg.topology.Topology):
+            def __init__(self, *args):
+                calls['topology'] += 1
+                super(CountedTopology, self).__init__(*args)
+
+        monkeypatch.setattr(grg_mp2grg.topology, 'network_fingerprint', counted_fingerprint)
+        monkeypatch.setattr(grg_mp2grg.topology, 'Topology', CountedTopology)
+
+        cache = TopologyCache()
+        for _ in range(3):
+            case = grg_mp2grg.io.build_mp_case(self.grg_data, mapping_ids, topology_cache=cache)
+            assert case == self.mp_case
+        assert calls == {'fingerprint': 1, 'topology': 1}
+
+        grg_data = copy.deepcopy(self.grg_data)
+        grg_mp2grg.io.build_mp_case(grg_data, mapping_ids, topology_cache=cache)
+        assert calls == {'fingerprint': 2, 'topology': 1}
+
+        grg_data['network']['id'] = 'other'
+        cache.invalidate()
+        grg_mp2grg.io.build_mp_case(grg_data, mapping_ids, topology_cache=cache)
+        assert calls == {'fingerprint': 3, 'topology': 2}